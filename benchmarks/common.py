@@ -0,0 +1,84 @@
+#----------------------------------------------------------------------------
+#
+#  Copyright (c) 2013-14, Enthought, Inc.
+#  All rights reserved.
+#
+#  This software is provided without warranty under the terms of the BSD
+#  license included in /LICENSE.txt and may be redistributed only
+#  under the conditions described in the aforementioned license.  The license
+#  is also available online at http://www.enthought.com/licenses/BSD.txt
+#
+#  Thanks for using Enthought open source!
+#
+#----------------------------------------------------------------------------
+""" Helpers shared by the benchmark modules.
+
+The benchmarks run headless: unless told otherwise, Qt uses the
+`offscreen` platform.
+
+"""
+import os
+import types
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+import six  # noqa
+
+from enaml.core.parser import parse  # noqa
+from enaml.core.enaml_compiler import EnamlCompiler  # noqa
+from enaml.qt.qt_application import QtApplication  # noqa
+
+import traits_enaml  # noqa
+from traits_enaml.compat import QApplication  # noqa
+
+#: The traits_enaml.imports options of the benchmarked operator modes.
+OPERATOR_MODES = {
+    'default': {},
+    'coalesce': {'coalesce': True},
+    'observe': {'observe': True},
+}
+
+
+def get_application():
+    """ Return the enaml application, creating it if necessary.
+
+    """
+    app = QtApplication.instance()
+    if app is None:
+        app = QtApplication()
+    return app
+
+
+def process_events():
+    """ Run the pending events of the Qt event loop.
+
+    """
+    qt_app = QApplication.instance()
+    qt_app.sendPostedEvents()
+    qt_app.processEvents()
+
+
+def compile_enaml(source, mode='default'):
+    """ Compile enaml source with the Traits Enaml operators.
+
+    Parameters
+    ----------
+    source : str
+        The enaml source to compile.
+
+    mode : str, optional
+        The key in `OPERATOR_MODES` of the operators to use.
+
+    Returns
+    -------
+    result : dict
+        The namespace of the compiled module.
+
+    """
+    enaml_ast = parse(source, filename='__enaml_benchmarks__')
+    code = EnamlCompiler.compile(enaml_ast, '__enaml_benchmarks__')
+    module = types.ModuleType('__benchmarks__')
+    ns = module.__dict__
+    with traits_enaml.imports(**OPERATOR_MODES[mode]):
+        six.exec_(code, ns, ns)
+    return ns
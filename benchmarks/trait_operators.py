@@ -0,0 +1,188 @@
+#----------------------------------------------------------------------------
+#
+#  Copyright (c) 2013-14, Enthought, Inc.
+#  All rights reserved.
+#
+#  This software is provided without warranty under the terms of the BSD
+#  license included in /LICENSE.txt and may be redistributed only
+#  under the conditions described in the aforementioned license.  The license
+#  is also available online at http://www.enthought.com/licenses/BSD.txt
+#
+#  Thanks for using Enthought open source!
+#
+#----------------------------------------------------------------------------
+""" Benchmarks of the Traits Enaml operators and of the TraitsTracer.
+
+"""
+from traits.api import HasTraits, Int, List, Str
+
+from traits_enaml.traits_tracer import TraitsTracer
+
+from .common import (
+    OPERATOR_MODES, compile_enaml, get_application, process_events)
+
+
+class Model(HasTraits):
+    value = Str()
+    count = Int()
+    values = List(Str)
+
+
+FIELDS_SOURCE = """
+from enaml.core.api import Looper
+from enaml.widgets.api import Container, Field, Window
+
+enamldef Main(Window):
+    attr model
+    attr fields
+    Container:
+        Looper:
+            iterable = range(fields)
+            Field:
+                text << model.value
+"""
+
+EXPRESSION_SOURCE = """
+from enaml.widgets.api import Field, Window
+
+enamldef Main(Window):
+    attr model
+    Field:
+        name = 'field'
+        text << '{} {}'.format(model.value, model.count) + str(model.values)
+    Field:
+        name = 'chain'
+        text << model.value
+"""
+
+
+class TimeExpressionEvaluation(object):
+    """ The cost of evaluating a traced `<<` expression.
+
+    """
+    params = sorted(OPERATOR_MODES)
+    param_names = ['mode']
+
+    def setup(self, mode):
+        get_application()
+        Main = compile_enaml(EXPRESSION_SOURCE, mode)['Main']
+        self.model = Model(values=['a', 'b', 'c'])
+        self.view = Main(model=self.model)
+        self.view.initialize()
+        self.field = self.view.find('field')
+        self.chain = self.view.find('chain')
+
+    def teardown(self, mode):
+        self.view.destroy()
+
+    def time_evaluate(self, mode):
+        self.field._d_engine.read(self.field, 'text')
+
+    def time_evaluate_chain(self, mode):
+        self.chain._d_engine.read(self.chain, 'text')
+
+
+class TimeNotificationFanOut(object):
+    """ The latency of a trait change propagated to many bound widgets.
+
+    """
+    params = ([1, 10, 100], sorted(OPERATOR_MODES))
+    param_names = ['fields', 'mode']
+
+    def setup(self, fields, mode):
+        get_application()
+        Main = compile_enaml(FIELDS_SOURCE, mode)['Main']
+        self.model = Model()
+        self.view = Main(model=self.model, fields=fields)
+        self.view.show()
+        process_events()
+        self.counter = 0
+
+    def teardown(self, fields, mode):
+        self.view.destroy()
+        process_events()
+
+    def time_notify(self, fields, mode):
+        self.counter += 1
+        self.model.value = str(self.counter)
+        process_events()
+
+
+class TimeViewConstruction(object):
+    """ The time to construct a view with many bound fields.
+
+    Each sample constructs a single view, which is destroyed in
+    `teardown`, so that the samples do not measure a growing heap.
+
+    """
+    number = 1
+    params = ([10, 100, 500], sorted(OPERATOR_MODES))
+    param_names = ['fields', 'mode']
+
+    def setup(self, fields, mode):
+        get_application()
+        self.Main = compile_enaml(FIELDS_SOURCE, mode)['Main']
+        self.model = Model()
+        self.views = []
+
+    def teardown(self, fields, mode):
+        for view in self.views:
+            view.destroy()
+        process_events()
+
+    def time_construct(self, fields, mode):
+        view = self.Main(model=self.model, fields=fields)
+        view.initialize()
+        view.activate_proxy()
+        self.views.append(view)
+
+
+class TrackMemoryPerBinding(object):
+    """ The memory allocated per bound widget.
+
+    """
+    params = sorted(OPERATOR_MODES)
+    param_names = ['mode']
+    unit = 'bytes'
+
+    def setup(self, mode):
+        try:
+            import tracemalloc
+        except ImportError:
+            # asv skips the benchmarks whose setup raises this error
+            raise NotImplementedError('tracemalloc is not available')
+        self.tracemalloc = tracemalloc
+        get_application()
+        self.Main = compile_enaml(FIELDS_SOURCE, mode)['Main']
+        self.model = Model()
+
+    def track_memory_per_binding(self, mode):
+        tracemalloc = self.tracemalloc
+        fields = 100
+        tracemalloc.start()
+        try:
+            before = tracemalloc.get_traced_memory()[0]
+            view = self.Main(model=self.model, fields=fields)
+            view.initialize()
+            after = tracemalloc.get_traced_memory()[0]
+        finally:
+            tracemalloc.stop()
+        view.destroy()
+        return (after - before) // fields
+
+
+class TimeTraitsTracer(object):
+    """ The cost of tracing the attribute loads of an expression.
+
+    """
+    def setup(self):
+        self.model = Model()
+        self.tracer = TraitsTracer(None, 'text')
+
+    def time_load_attr(self):
+        tracer = self.tracer
+        model = self.model
+        tracer.load_attr(model, 'value')
+        tracer.load_attr(model, 'count')
+        tracer.load_attr(model, 'values')
+        tracer.get_iter(model.values)
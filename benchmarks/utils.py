@@ -0,0 +1,60 @@
+#----------------------------------------------------------------------------
+#
+#  Copyright (c) 2013-14, Enthought, Inc.
+#  All rights reserved.
+#
+#  This software is provided without warranty under the terms of the BSD
+#  license included in /LICENSE.txt and may be redistributed only
+#  under the conditions described in the aforementioned license.  The license
+#  is also available online at http://www.enthought.com/licenses/BSD.txt
+#
+#  Thanks for using Enthought open source!
+#
+#----------------------------------------------------------------------------
+""" Micro-benchmarks of the LoopbackGuard.
+
+"""
+from traits_enaml.utils import (
+    LoopbackGuard, LoopbackItemContext, ThreadLocalLoopbackGuard)
+
+GUARD_TYPES = {
+    'shared': LoopbackGuard,
+    'thread_local': ThreadLocalLoopbackGuard,
+}
+
+
+class TimeLoopbackGuard(object):
+    """ The cost of a guarded update with a LoopbackGuard.
+
+    """
+    params = sorted(GUARD_TYPES)
+    param_names = ['guard']
+
+    def setup(self, guard):
+        self.guard = GUARD_TYPES[guard]()
+        self.item = object()
+        self.items = (object(), object())
+        self.context = LoopbackItemContext(self.guard, self.item)
+
+    def time_call_item(self, guard):
+        with self.guard(self.item):
+            pass
+
+    def time_call_items(self, guard):
+        with self.guard(*self.items):
+            pass
+
+    def time_reused_item_context(self, guard):
+        with self.context:
+            pass
+
+    def time_acquire_release_item(self, guard):
+        self.guard.acquire_item(self.item)
+        self.guard.release_item(self.item)
+
+    def time_contains_unlocked(self, guard):
+        self.item in self.guard
+
+    def time_contains_locked(self, guard):
+        with self.context:
+            self.item in self.guard
@@ -15,7 +15,7 @@ from traits.etsconfig.api import ETSConfig
 
 import enaml
 
-from .trait_operators import TRAIT_OPERATORS
+from .trait_operators import TRAIT_OPERATORS, make_trait_operators  # noqa
 
 if ETSConfig.toolkit not in ['', 'qt4', 'null']:
     raise ValueError('traits-enaml does not support WX')
@@ -24,5 +24,45 @@ if ETSConfig.toolkit != 'null':
     ETSConfig.toolkit = 'qt4'
 
 
-def imports():
-    return enaml.imports(operators=TRAIT_OPERATORS)
+def imports(coalesce=False, observe=False, throttle=None, dispatch='same',
+            skip_equal=False, items_events=False):
+    """ Return a context manager to import enaml files with the Traits
+    Enaml operators.
+
+    Parameters
+    ----------
+    coalesce : bool, optional
+        If True, the '<<' and ':=' expressions are re-evaluated at most
+        once per event loop iteration. The default is False.
+
+    observe : bool, optional
+        If True, the '<<' and ':=' expressions subscribe to the traits
+        with the `observe` framework (traits >= 6.1) instead of
+        `on_trait_change`. The default is False.
+
+    throttle : int, optional
+        If given, the '<<' and ':=' expressions are re-evaluated at most
+        once per `throttle` milliseconds, and always with the latest
+        values of their dependencies.
+
+    dispatch : {'same', 'ui'}, optional
+        With 'ui', the trait changes which happen on a worker thread
+        update the '<<' and ':=' expressions on the GUI thread, once
+        for a burst of changes. The default is 'same'.
+
+    skip_equal : bool, optional
+        If True, a '<<' or ':=' expression re-evaluated to a value equal
+        to the last computed one leaves its attribute untouched. The
+        default is False.
+
+    items_events : bool, optional
+        If True, a '<<' or ':=' binding of an attribute chain which
+        evaluates to a collection trait, e.g. `values << model.values`,
+        fires the items events of the collection on the `values_items`
+        event of the owner, if it declares one. The default is False.
+
+    """
+    operators = make_trait_operators(
+        coalesce=coalesce, observe=observe, throttle=throttle,
+        dispatch=dispatch, skip_equal=skip_equal, items_events=items_events)
+    return enaml.imports(operators=operators)
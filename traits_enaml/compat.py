@@ -14,12 +14,18 @@
 """ Compatibility module to support a wider range of enaml versions.
 
 """
-__all__ = ['QApplication', 'QGLWidget']
+__all__ = [
+    'QApplication', 'QComboBox', 'QGLWidget', 'QLineEdit', 'QSpinBox',
+    'QStyleOptionViewItem', 'QStyledItemDelegate', 'QTableView', 'QWidget']
 
 try:
-    from enaml.qt.QtGui import QApplication
+    from enaml.qt.QtGui import (
+        QApplication, QComboBox, QLineEdit, QSpinBox, QStyleOptionViewItem,
+        QStyledItemDelegate, QTableView, QWidget)
 except ImportError:
-    from enaml.qt.QtWidgets import QApplication
+    from enaml.qt.QtWidgets import (
+        QApplication, QComboBox, QLineEdit, QSpinBox, QStyleOptionViewItem,
+        QStyledItemDelegate, QTableView, QWidget)
 
 try:
     from enaml.qt.QtOpenGL import QGLWidget
@@ -0,0 +1,249 @@
+#----------------------------------------------------------------------------
+#
+#  Copyright (c) 2013-14, Enthought, Inc.
+#  All rights reserved.
+#
+#  This software is provided without warranty under the terms of the BSD
+#  license included in /LICENSE.txt and may be redistributed only
+#  under the conditions described in the aforementioned license.  The license
+#  is also available online at http://www.enthought.com/licenses/BSD.txt
+#
+#  Thanks for using Enthought open source!
+#
+#----------------------------------------------------------------------------
+""" Runtime statistics of the traits bindings.
+
+When enabled, the Traits Enaml read handlers and observers record, for
+every (owner, name) binding, how often and how long the expression is
+evaluated, how many traits it depends on and how many notifications it
+receives. Recording is disabled by default and costs a single module
+attribute lookup per evaluation and notification while disabled.
+
+Example::
+
+    from traits_enaml import stats
+
+    stats.enable()
+    ...  # exercise the views
+    print(stats.dump())
+
+Note that the statistics keep a reference to the owners of the
+bindings until `reset` is called.
+
+"""
+import json
+
+#: Whether the statistics are recorded. Use `enable` and `disable` to
+#: change it.
+enabled = False
+
+#: The recorded BindingStats, keyed on the (owner, name) pair.
+_records = {}
+
+#: The columns of the table generated by `dump`.
+_COLUMNS = (
+    ('binding', 'Binding'),
+    ('evaluations', 'Evaluations'),
+    ('total_time', 'Total (ms)'),
+    ('mean_time', 'Mean (ms)'),
+    ('max_time', 'Max (ms)'),
+    ('traced_traits', 'Traits'),
+    ('notifications', 'Notifications'),
+)
+
+
+class BindingStats(object):
+    """ The statistics of a single (owner, name) binding.
+
+    Times are expressed in seconds.
+
+    """
+    __slots__ = (
+        'owner', 'name', 'evaluations', 'total_time', 'max_time',
+        'traced_traits', 'notifications')
+
+    def __init__(self, owner, name):
+        """ Initialize a BindingStats.
+
+        Parameters
+        ----------
+        owner : Declarative
+            The declarative object owning the binding.
+
+        name : str
+            The name of the bound attribute.
+
+        """
+        self.owner = owner
+        self.name = name
+        self.evaluations = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self.traced_traits = 0
+        self.notifications = 0
+
+    @property
+    def binding(self):
+        """ A readable description of the binding.
+
+        """
+        owner = self.owner
+        owner_name = getattr(owner, 'name', '')
+        if owner_name:
+            label = '{}({})'.format(type(owner).__name__, owner_name)
+        else:
+            label = type(owner).__name__
+        return '{}.{}'.format(label, self.name)
+
+    @property
+    def mean_time(self):
+        """ The mean evaluation time of the expression.
+
+        """
+        if self.evaluations == 0:
+            return 0.0
+        return self.total_time / self.evaluations
+
+    def as_dict(self):
+        """ Return the statistics as a JSON serializable dictionary.
+
+        """
+        return {
+            'binding': self.binding,
+            'evaluations': self.evaluations,
+            'total_time': self.total_time,
+            'mean_time': self.mean_time,
+            'max_time': self.max_time,
+            'traced_traits': self.traced_traits,
+            'notifications': self.notifications,
+        }
+
+
+def enable():
+    """ Start recording the statistics of the traits bindings.
+
+    """
+    global enabled
+    enabled = True
+
+
+def disable():
+    """ Stop recording the statistics of the traits bindings.
+
+    The statistics recorded so far are kept until `reset` is called.
+
+    """
+    global enabled
+    enabled = False
+
+
+def reset():
+    """ Discard the recorded statistics.
+
+    """
+    _records.clear()
+
+
+def _get_record(owner, name):
+    key = (owner, name)
+    record = _records.get(key)
+    if record is None:
+        record = _records[key] = BindingStats(owner, name)
+    return record
+
+
+def record_evaluation(owner, name, duration, traced_traits):
+    """ Record the evaluation of a bound expression.
+
+    Parameters
+    ----------
+    owner : Declarative
+        The declarative object owning the binding.
+
+    name : str
+        The name of the bound attribute.
+
+    duration : float
+        The evaluation time of the expression, in seconds.
+
+    traced_traits : int
+        The number of traits the expression depends on.
+
+    """
+    record = _get_record(owner, name)
+    record.evaluations += 1
+    record.total_time += duration
+    record.max_time = max(record.max_time, duration)
+    record.traced_traits = traced_traits
+
+
+def record_notification(owner, name):
+    """ Record a change notification received by a binding.
+
+    Parameters
+    ----------
+    owner : Declarative
+        The declarative object owning the binding.
+
+    name : str
+        The name of the bound attribute.
+
+    """
+    _get_record(owner, name).notifications += 1
+
+
+def get_stats():
+    """ Return the recorded statistics.
+
+    Returns
+    -------
+    result : list
+        The BindingStats of the bindings, sorted by decreasing total
+        evaluation time.
+
+    """
+    return sorted(
+        _records.values(), key=lambda record: record.total_time,
+        reverse=True)
+
+
+def dump(format='table'):
+    """ Return the recorded statistics as a string.
+
+    Parameters
+    ----------
+    format : {'table', 'json'}, optional
+        The format of the output. The default is a plain text table.
+
+    Returns
+    -------
+    result : str
+        The statistics of the bindings, sorted by decreasing total
+        evaluation time.
+
+    """
+    records = [record.as_dict() for record in get_stats()]
+    if format == 'json':
+        return json.dumps(records, indent=2, sort_keys=True)
+    elif format != 'table':
+        raise ValueError('Unknown statistics format: {!r}'.format(format))
+
+    rows = [[title for _, title in _COLUMNS]]
+    for record in records:
+        row = []
+        for key, _ in _COLUMNS:
+            value = record[key]
+            if key.endswith('_time'):
+                value = '{:.3f}'.format(value * 1000.0)
+            row.append(str(value))
+        rows.append(row)
+    widths = [max(len(row[index]) for row in rows)
+              for index in range(len(_COLUMNS))]
+    lines = []
+    for row in rows:
+        cells = [row[0].ljust(widths[0])]
+        cells.extend(
+            cell.rjust(width) for cell, width in zip(row[1:], widths[1:]))
+        lines.append('  '.join(cells))
+    lines.insert(1, '  '.join('-' * width for width in widths))
+    return '\n'.join(lines)
@@ -50,6 +50,10 @@ def print_enaml_widget_tree(widget, level=0):
 
 class EnamlTestAssistant(GuiTestAssistant, AtomTestAssistant):
 
+    #: The keyword arguments passed to `traits_enaml.imports` when the
+    #: source is compiled by `parse_and_create`.
+    imports_options = {}
+
     def tearDown(self):
         super(EnamlTestAssistant, self).tearDown()
         self.enaml_module = None
@@ -117,7 +121,7 @@ class EnamlTestAssistant(GuiTestAssistant, AtomTestAssistant):
         enaml_module = types.ModuleType('__tests__')
         ns = enaml_module.__dict__
 
-        with traits_enaml.imports():
+        with traits_enaml.imports(**self.imports_options):
             six.exec_(code, ns, ns)
         View = ns['MainView']
 
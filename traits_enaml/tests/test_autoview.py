@@ -11,18 +11,37 @@
 #  Thanks for using Enthought open source!
 #
 #----------------------------------------------------------------------------
+import gc
 import unittest
 import datetime
 
 import traits_enaml
+from enaml.colors import Color as EnamlColor
 from traits.api import (
-    Bool, Button, Date, Enum, Float, Int, HasTraits, List, Range, Str, Time,
-    Tuple)
+    Bool, Button, Date, Dict, Directory, Enum, File, Float, Int, HasTraits,
+    Instance, List, Range, Str, Time, Tuple)
+from traitsui.api import Color as TraitsUIColor
+from traits_enaml.compat import QWidget
 from traits_enaml.testing.enaml_test_assistant import EnamlTestAssistant
-from traits_enaml.widgets.auto_view import auto_window, auto_view
+from traits_enaml.widgets import shared_value as shared_value_module
+from traits_enaml.widgets import traits_view
+from traits_enaml.widgets.editor_utils import enum_lookup
+from traits_enaml.widgets.traits_view import SharedTraitsView
+from traits_enaml.widgets import auto_view as auto_view_module
+from traits_enaml.widgets.auto_view import (
+    TRAIT2ENAML, auto_window, auto_view, register_editor, unregister_editor,
+    _get_factory, _model_editors)
 
 with traits_enaml.imports():
-    from traits_enaml.widgets.auto_view import DefaultEditor
+    from enaml.widgets.api import Container
+    from traits_enaml.widgets.auto_view import (
+        AutoWindow, ColorEditor, DefaultEditor, DirectoryEditor, FallbackEditor,
+        FileEditor, InstanceEditor, IntEditor, ListEditor, StrEditor,
+        TraitsUIColorEditor, TupleEditor, PyfaceColor)
+
+
+class Name(Str):
+    pass
 
 
 class AllTypes(HasTraits):
@@ -47,6 +66,24 @@ class AllTypes(HasTraits):
     _notifications = List(Tuple)
 
 
+class OtherTypes(HasTraits):
+    """ A class with the traits of the non basic editors
+
+    """
+    numbers = List([1, 2])
+    pair = Tuple(1, 'a')
+    child = Instance(AllTypes, ())
+    path = File()
+    folder = Directory()
+    children = List(Instance(AllTypes))
+    mapping = Dict(Str, Int)
+
+
+ManyTraits = type(
+    'ManyTraits', (HasTraits,),
+    {'value_{:03d}'.format(index): Str() for index in range(100)})
+
+
 class TestAutoView(EnamlTestAssistant, unittest.TestCase):
 
     def test_auto_view(self):
@@ -69,13 +106,425 @@ class TestAutoView(EnamlTestAssistant, unittest.TestCase):
         self.check_component_counts(window)
         self.check_label_text(window)
 
+    def test_lazy_auto_view(self):
+        with traits_enaml.imports():
+            from enaml.widgets.api import Window
+
+        model = AllTypes()
+        view = auto_view(model=model, lazy=True)
+        editors = view.objects[1::2]
+        self.assertTrue(all(
+            type(editor).__name__ == 'EditorPlaceholder'
+            for editor in editors))
+        window = Window()
+        window.insert_children(None, (view,))
+
+        def condition():
+            placeholders = self.find_all_enaml_widgets(
+                window, 'EditorPlaceholder')
+            return len(placeholders) == 0
+
+        with self.event_loop_until_condition(condition):
+            window.show()
+        self.check_component_counts(window)
+        self.check_label_text(window)
+
+    def test_lazy_auto_window(self):
+        model = ManyTraits()
+        window = auto_window(model=model, lazy=True)
+
+        def condition():
+            return len(self.find_all_enaml_widgets(window, 'StrEditor')) > 0
+
+        with self.event_loop_until_condition(condition):
+            window.show()
+        with self.event_loop(repeat=5):
+            pass
+
+        # the editors which are not scrolled into view are not created
+        placeholders = self.find_all_enaml_widgets(window, 'EditorPlaceholder')
+        self.assertGreater(len(placeholders), 0)
+        self.assertLess(len(placeholders), 100)
+
+        view = window.view.view
+        include = self.find_enaml_widget(view, 'Include')
+        changes = []
+        include.observe('objects', changes.append)
+        for placeholder in placeholders:
+            placeholder.materialize()
+        editors = self.find_all_enaml_widgets(window, 'StrEditor')
+        self.assertEqual(len(editors), 100)
+        # the editors replace the placeholders one by one, the Include
+        # does not insert all its objects again
+        self.assertEqual(changes, [])
+        self.assertEqual(view.children[1:-1:2], editors)
+
+        # the objects of the view list the editors, not the placeholders
+        self.assertEqual(view.objects[1::2], editors)
+        self.assertEqual(include.objects, view.objects)
+
+    def test_materialize_then_update_objects(self):
+        with traits_enaml.imports():
+            from enaml.widgets.api import Label, Window
+
+        view = auto_view(model=AllTypes(), lazy=True)
+        window = Window()
+        window.insert_children(None, (view,))
+        with self.event_loop():
+            window.show()
+
+        placeholder = self.find_all_enaml_widgets(
+            window, 'EditorPlaceholder')[0]
+        editor = placeholder.materialize()
+        self.assertTrue(placeholder.is_destroyed)
+
+        # a later update of the objects keeps the materialized editor
+        view.objects = view.objects + [Label(text='extra')]
+        self.assertFalse(editor.is_destroyed)
+        self.assertIs(editor.parent, view)
+        self.assertIn(editor, view.objects)
+
+        # and removing the objects destroys it
+        view.objects = []
+        self.assertTrue(editor.is_destroyed)
+        window.destroy()
+
+    def test_progressive_auto_window(self):
+        model = ManyTraits()
+        window = auto_window(model=model, progressive=True)
+        window.show()
+        # the window is shown before the editors are created
+        self.assertEqual(self.find_all_enaml_widgets(window, 'StrEditor'), [])
+
+        def condition():
+            editors = self.find_all_enaml_widgets(window, 'StrEditor')
+            return len(editors) == 100
+
+        include = self.find_enaml_widget(window.view.view, 'Include')
+        changes = []
+        include.observe('objects', changes.append)
+        with self.event_loop_until_condition(condition):
+            pass
+        labels = self.find_all_enaml_widgets(window, 'Label')
+        self.assertEqual(len(labels), 100)
+        # each chunk is inserted alone, the Include does not insert all
+        # its objects again
+        self.assertEqual(changes, [])
+        self.assertEqual(len(include.objects), 200)
+        self.assertEqual(window.view.view.objects, include.objects)
+        self.assertEqual(window.view.view.children[:-1], include.objects)
+        self.assertEqual(labels[0].text, 'Value 000')
+
+    def test_progressive_build_destroyed(self):
+        time_slice = auto_view_module.PROGRESSIVE_TIME_SLICE
+        auto_view_module.PROGRESSIVE_TIME_SLICE = 0.0
+        try:
+            view = auto_view(ManyTraits(), progressive=True)
+            with self.event_loop(repeat=3):
+                pass
+            # one pair is created at every iteration of the event loop
+            self.assertGreater(len(view.objects), 0)
+            self.assertLess(len(view.objects), 200)
+            view.destroy()
+            count = len(view.objects)
+            with self.event_loop(repeat=3):
+                pass
+            self.assertEqual(len(view.objects), count)
+        finally:
+            auto_view_module.PROGRESSIVE_TIME_SLICE = time_slice
+
+    def test_enum_editor(self):
+        first, second = AllTypes(), AllTypes(enum_value='baz')
+        container = Container()
+        container.insert_children(None, [auto_view(first), auto_view(second)])
+        window = AutoWindow(view=container)
+        with self.event_loop():
+            window.show()
+
+        editors = self.find_all_enaml_widgets(window, 'EnumEditor')
+        self.assertEqual(len(editors), 2)
+        self.assertIs(editors[0].lookup, editors[1].lookup)
+        self.assertEqual(editors[0].items, ['foo', 'bar', 'baz', 'qux'])
+        self.assertEqual(editors[1].index, 2)
+
+        first.enum_value = 'qux'
+        self.assertEqual(editors[0].index, 3)
+        editors[0].index = 1
+        self.assertEqual(first.enum_value, 'bar')
+        self.assertEqual(second.enum_value, 'baz')
+
+    def test_shared_values(self):
+        model = AllTypes()
+        container = Container()
+        container.insert_children(None, [auto_view(model), auto_view(model)])
+        window = AutoWindow(view=container)
+        with self.event_loop():
+            window.show()
+
+        editors = self.find_all_enaml_widgets(window, 'IntEditor')
+        self.assertEqual(len(editors), 2)
+        self.assertIs(editors[0].shared, editors[1].shared)
+        # a single listener is hooked up for both editors
+        notifiers = model._trait('int_value', 0)._notifiers(True)
+        self.assertEqual(len(notifiers), 1)
+
+        editors[0].value = 5
+        self.assertEqual(model.int_value, 5)
+        self.assertEqual(editors[1].value, 5)
+
+        with self.event_loop():
+            window.destroy()
+        self.assertEqual(len(notifiers), 0)
+        self.assertEqual(shared_value_module._shared_values, {})
+
+    def test_shared_value_follows_model(self):
+        first = AllTypes(int_value=1)
+        second = AllTypes(int_value=2)
+        window = AutoWindow(view=auto_view(first))
+        with self.event_loop():
+            window.show()
+
+        editor = self.find_enaml_widget(window, 'IntEditor')
+        self.assertEqual(editor.value, 1)
+        editor.model = second
+        self.assertIs(editor.shared.model, second)
+        self.assertEqual(editor.value, 2)
+        self.assertEqual(len(first._trait('int_value', 0)._notifiers(True)), 0)
+
+        editor.value = 3
+        self.assertEqual(second.int_value, 3)
+        self.assertEqual(first.int_value, 1)
+
+        with self.event_loop():
+            window.destroy()
+        self.assertEqual(shared_value_module._shared_values, {})
+
+    def test_enum_lookup(self):
+        trait_type = Enum(1, 'a', [2], True).as_ctrait().trait_type
+        lookup = enum_lookup(trait_type)
+        self.assertIs(enum_lookup(trait_type), lookup)
+        self.assertEqual(lookup.items, ['1', 'a', '[2]', 'True'])
+        # True == 1, the first index is returned like with list.index
+        self.assertEqual(
+            [lookup.index(value) for value in (1, 'a', [2], True)],
+            [0, 1, 2, 0])
+        with self.assertRaises(ValueError):
+            lookup.index('b')
+
+        trait_type.values = ('a', 'b')
+        self.assertEqual(enum_lookup(trait_type).index('b'), 1)
+
+    def test_editors_cache(self):
+        first = _model_editors(AllTypes())
+        second = _model_editors(AllTypes())
+        self.assertIs(first, second)
+        self.assertIn(AllTypes, auto_view_module._class_editors_cache)
+
+    def test_editors_cache_invalidation(self):
+        _model_editors(AllTypes())
+
+        original = TRAIT2ENAML[List]
+        TRAIT2ENAML[List] = lambda trait_type: StrEditor
+        try:
+            self.assertEqual(auto_view_module._class_editors_cache, {})
+            editors = dict(
+                (desc.name, editor)
+                for desc, editor in _model_editors(AllTypes()))
+            self.assertIs(editors['list_value'], StrEditor)
+        finally:
+            TRAIT2ENAML[List] = original
+
+        editors = dict(
+            (desc.name, editor) for desc, editor in _model_editors(AllTypes()))
+        self.assertIs(editors['list_value'], ListEditor)
+
+    def test_editors_instance_trait(self):
+        model = AllTypes()
+        model.add_trait('str_value', Float(1.0))
+
+        editors = dict(
+            (desc.name, editor) for desc, editor in _model_editors(model))
+        self.assertIsNot(editors['str_value'], StrEditor)
+        editors = dict(
+            (desc.name, editor)
+            for desc, editor in _model_editors(AllTypes()))
+        self.assertIs(editors['str_value'], StrEditor)
+
+    def test_register_editor_mro(self):
+        self.assertIs(_get_factory(Name)(Name()), StrEditor)
+
+        factory = lambda trait_type: IntEditor
+        register_editor(Name, factory)
+        try:
+            self.assertIs(_get_factory(Name), factory)
+            self.assertIs(_get_factory(Str)(Str()), StrEditor)
+        finally:
+            unregister_editor(Name, factory)
+        self.assertIs(_get_factory(Name)(Name()), StrEditor)
+
+    def test_register_editor_priority(self):
+        high = lambda trait_type: IntEditor
+        low = lambda trait_type: DefaultEditor
+        register_editor(Str, high, priority=10)
+        register_editor(Str, low, priority=5)
+        try:
+            self.assertIs(_get_factory(Str), high)
+            self.assertIs(_get_factory(Name), high)
+        finally:
+            unregister_editor(Str, high)
+        try:
+            self.assertIs(_get_factory(Str), low)
+        finally:
+            unregister_editor(Str, low)
+        self.assertIs(_get_factory(Str)(Str()), StrEditor)
+
+    def test_other_editors(self):
+        editors = dict(
+            (desc.name, editor)
+            for desc, editor in _model_editors(OtherTypes()))
+        self.assertIs(editors['numbers'], ListEditor)
+        self.assertIs(editors['pair'], TupleEditor)
+        self.assertIs(editors['child'], InstanceEditor)
+        self.assertIs(editors['path'], FileEditor)
+        self.assertIs(editors['folder'], DirectoryEditor)
+        self.assertIs(editors['children'], FallbackEditor)
+        self.assertIs(editors['mapping'], FallbackEditor)
+
+    @unittest.skipIf(PyfaceColor is None, 'PyfaceColor is not available')
+    def test_color_editor(self):
+        class ColorModel(HasTraits):
+            color = PyfaceColor('red')
+
+        model = ColorModel()
+        editors = dict(
+            (desc.name, editor) for desc, editor in _model_editors(model))
+        self.assertIs(editors['color'], ColorEditor)
+
+        window = auto_window(model)
+        with self.event_loop():
+            window.show()
+        editor = self.find_enaml_widget(window, 'ColorEditor')
+        self.assertEqual(editor.text, '#FF0000FF')
+        model.color = '#00ff00'
+        self.assertEqual(editor.text, '#00FF00FF')
+
+    def test_traitsui_color_editor(self):
+        class ColorModel(HasTraits):
+            color = TraitsUIColor('red')
+
+        model = ColorModel()
+        editors = dict(
+            (desc.name, editor) for desc, editor in _model_editors(model))
+        self.assertIs(editors['color'], TraitsUIColorEditor)
+
+        window = auto_window(model)
+        with self.event_loop():
+            window.show()
+        editor = self.find_enaml_widget(window, 'TraitsUIColorEditor')
+        self.assertEqual(editor.text, '#FF0000FF')
+        editor.shared.value = editor.from_color(EnamlColor(0, 0, 255, 255))
+        self.assertEqual(model.color.getRgb(), (0, 0, 255, 255))
+        self.assertEqual(editor.text, '#0000FFFF')
+
+    def test_large_literal_editor(self):
+        model = OtherTypes(numbers=list(range(2000)))
+        window = auto_window(model)
+        with self.event_loop():
+            window.show()
+
+        list_editor = self.find_enaml_widget(window, 'ListEditor')
+        self.assertTrue(list_editor.read_only)
+        self.assertLess(len(list_editor.text), 200)
+        self.assertTrue(list_editor.text.endswith('...]'))
+        list_editor.text = '[0, 1]'
+        self.assertEqual(len(model.numbers), 2000)
+
+        model.numbers = [1, 2]
+        self.assertFalse(list_editor.read_only)
+        self.assertEqual(list_editor.text, '[1, 2]')
+
+    def test_literal_editors(self):
+        model = OtherTypes()
+        window = auto_window(model)
+        with self.event_loop():
+            window.show()
+
+        list_editor = self.find_enaml_widget(window, 'ListEditor')
+        self.assertEqual(list_editor.text, '[1, 2]')
+        list_editor.text = '[3, 4]'
+        self.assertEqual(model.numbers, [3, 4])
+        model.numbers.append(5)
+        self.assertEqual(list_editor.text, '[3, 4, 5]')
+        # literal_eval raises TypeError on the unhashable keys
+        list_editor.text = '{[1]: 2}'
+        self.assertEqual(model.numbers, [3, 4, 5])
+        self.assertEqual(list_editor.text, '[3, 4, 5]')
+        list_editor.text = '[' * 1000 + ']' * 1000
+        self.assertEqual(model.numbers, [3, 4, 5])
+        self.assertEqual(list_editor.text, '[3, 4, 5]')
+
+        tuple_editor = self.find_enaml_widget(window, 'TupleEditor')
+        tuple_editor.text = "(2, 'b')"
+        self.assertEqual(model.pair, (2, 'b'))
+        tuple_editor.text = '(2,'
+        self.assertEqual(tuple_editor.text, "(2, 'b')")
+        tuple_editor.text = "('b', 2)"
+        self.assertEqual(tuple_editor.text, "(2, 'b')")
+        self.assertEqual(model.pair, (2, 'b'))
+
+    def test_shared_fallback_ui(self):
+        model = OtherTypes()
+        window = auto_window(model)
+        with self.event_loop():
+            window.show()
+
+        fallbacks = self.find_all_enaml_widgets(window, 'FallbackEditor')
+        self.assertEqual(len(fallbacks), 2)
+        self.assertIsNotNone(fallbacks[0].ui)
+        self.assertIs(fallbacks[0].ui, fallbacks[1].ui)
+        self.assertEqual(len(traits_view._shared_uis), 1)
+
+        with self.event_loop():
+            window.destroy()
+        self.assertEqual(traits_view._shared_uis, {})
+
+    def test_shared_fallback_ui_released_on_collection(self):
+        model = OtherTypes()
+        parent = QWidget()
+        view = SharedTraitsView(model=model, name='mapping')
+        view.create_widget(parent)
+        self.assertEqual(len(traits_view._shared_uis), 1)
+
+        del view
+        gc.collect()
+        self.assertEqual(traits_view._shared_uis, {})
+        self.assertEqual(traits_view._ui_leases, {})
+
+    def test_lazy_fallback_ui(self):
+        model = OtherTypes()
+        window = auto_window(model, lazy=True)
+        window.initial_size = (400, 2000)
+        with self.event_loop(repeat=5):
+            window.show()
+
+        fallbacks = self.find_all_enaml_widgets(window, 'FallbackEditor')
+        self.assertEqual(len(fallbacks), 2)
+        # each materialized editor only builds the UI of its trait
+        self.assertIsNot(fallbacks[0].ui, fallbacks[1].ui)
+        self.assertEqual(fallbacks[0].ui.get_editors(fallbacks[1].name), [])
+        self.assertEqual(fallbacks[1].ui.get_editors(fallbacks[0].name), [])
+
+        with self.event_loop():
+            window.destroy()
+        self.assertEqual(traits_view._shared_uis, {})
+
     def check_component_counts(self, view):
-        expected_counts = [1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 2, 12]
+        expected_counts = [1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 12]
         components = [
             'BoolEditor', 'ButtonEditor', 'DateEditor',
             'EnumEditor', 'FloatEditor', 'FloatRangeEditor',
             'IntEditor', 'IntRangeEditor', 'StrEditor',
-            'TimeEditor', 'DefaultEditor', 'Label']
+            'TimeEditor', 'ListEditor', 'DefaultEditor', 'Label']
         for index, component in enumerate(components):
             items = self.find_all_enaml_widgets(view, component)
             self.assertEqual(len(items), expected_counts[index])
@@ -0,0 +1,145 @@
+#----------------------------------------------------------------------------
+#
+#  Copyright (c) 2013-14, Enthought, Inc.
+#  All rights reserved.
+#
+#  This software is provided without warranty under the terms of the BSD
+#  license included in /LICENSE.txt and may be redistributed only
+#  under the conditions described in the aforementioned license.  The license
+#  is also available online at http://www.enthought.com/licenses/BSD.txt
+#
+#  Thanks for using Enthought open source!
+#
+#----------------------------------------------------------------------------
+import gc
+import unittest
+
+from enaml.core.declarative import Declarative
+from traits.api import HasTraits, Int, List, TraitError
+
+from traits_enaml.widgets import shared_value as shared_value_module
+from traits_enaml.widgets.shared_value import (
+    acquire_shared_value, release_shared_value, shared_value)
+
+
+class Model(HasTraits):
+
+    count = Int(1)
+
+    values = List(Int)
+
+
+def notifier_count(model, name):
+    trait = model._trait(name, 0)
+    if trait is None:
+        return 0
+    return len(trait._notifiers(True))
+
+
+class TestSharedTraitValue(unittest.TestCase):
+
+    def setUp(self):
+        self.model = Model()
+
+    def tearDown(self):
+        self.model = None
+
+    def test_acquire_release(self):
+        shared = acquire_shared_value(self.model, 'count')
+        self.assertIs(acquire_shared_value(self.model, 'count'), shared)
+        self.assertEqual(shared.value, 1)
+        self.assertEqual(notifier_count(self.model, 'count'), 1)
+
+        release_shared_value(self.model, 'count')
+        self.assertEqual(notifier_count(self.model, 'count'), 1)
+        release_shared_value(self.model, 'count')
+        self.assertEqual(notifier_count(self.model, 'count'), 0)
+        self.assertEqual(shared_value_module._shared_values, {})
+
+        self.model.count = 2
+        self.assertEqual(shared.value, 1)
+
+    def test_trait_to_value(self):
+        shared = acquire_shared_value(self.model, 'count')
+        changes = []
+        shared.observe('value', changes.append)
+
+        self.model.count = 2
+        self.assertEqual(shared.value, 2)
+        self.assertEqual(len(changes), 1)
+        release_shared_value(self.model, 'count')
+
+    def test_value_to_trait(self):
+        shared = acquire_shared_value(self.model, 'count')
+
+        shared.value = 3
+        self.assertEqual(self.model.count, 3)
+
+        with self.assertRaises(TraitError):
+            shared.value = 'invalid'
+        self.assertEqual(shared.value, 3)
+        self.assertEqual(self.model.count, 3)
+        release_shared_value(self.model, 'count')
+
+    def test_items_changes(self):
+        shared = acquire_shared_value(self.model, 'values')
+        self.assertEqual(notifier_count(self.model, 'values_items'), 1)
+        changes = []
+        shared.observe('value', changes.append)
+
+        self.model.values.append(1)
+        self.assertEqual(len(changes), 1)
+        self.assertIs(changes[0]['value'], self.model.values)
+
+        release_shared_value(self.model, 'values')
+        self.assertEqual(notifier_count(self.model, 'values_items'), 0)
+
+
+class TestSharedValueOwner(unittest.TestCase):
+
+    def setUp(self):
+        self.model = Model()
+
+    def tearDown(self):
+        self.model = None
+
+    def test_released_on_destroyed(self):
+        owner = Declarative()
+        shared = shared_value(owner, self.model, 'count')
+        self.assertEqual(shared.value, 1)
+        self.assertEqual(notifier_count(self.model, 'count'), 1)
+
+        owner.destroy()
+        self.assertEqual(notifier_count(self.model, 'count'), 0)
+        self.assertEqual(shared_value_module._shared_values, {})
+        self.assertEqual(shared_value_module._owner_values, {})
+
+    def test_released_on_garbage_collection(self):
+        owner = Declarative()
+        shared_value(owner, self.model, 'count')
+        self.assertEqual(notifier_count(self.model, 'count'), 1)
+
+        del owner
+        gc.collect()
+        self.assertEqual(notifier_count(self.model, 'count'), 0)
+        self.assertEqual(shared_value_module._shared_values, {})
+        self.assertEqual(shared_value_module._owner_values, {})
+
+    def test_previous_value_released(self):
+        owner = Declarative()
+        other = Model()
+        shared = shared_value(owner, self.model, 'count')
+        self.assertIs(shared_value(owner, self.model, 'count'), shared)
+        self.assertEqual(notifier_count(self.model, 'count'), 1)
+
+        shared = shared_value(owner, other, 'count')
+        self.assertIs(shared.model, other)
+        self.assertEqual(notifier_count(self.model, 'count'), 0)
+        self.assertEqual(notifier_count(other, 'count'), 1)
+
+        self.assertIsNone(shared_value(owner, None, 'count'))
+        self.assertEqual(notifier_count(other, 'count'), 0)
+        self.assertEqual(shared_value_module._shared_values, {})
+
+        owner.destroy()
+        self.assertEqual(shared_value_module._owner_values, {})
@@ -0,0 +1,103 @@
+#----------------------------------------------------------------------------
+#
+#  Copyright (c) 2013-14, Enthought, Inc.
+#  All rights reserved.
+#
+#  This software is provided without warranty under the terms of the BSD
+#  license included in /LICENSE.txt and may be redistributed only
+#  under the conditions described in the aforementioned license.  The license
+#  is also available online at http://www.enthought.com/licenses/BSD.txt
+#
+#  Thanks for using Enthought open source!
+#
+#----------------------------------------------------------------------------
+import json
+import unittest
+
+from traits.api import HasTraits, Int, Str
+
+from traits_enaml import stats
+from traits_enaml.testing.enaml_test_assistant import EnamlTestAssistant
+
+
+class Model(HasTraits):
+    first = Str()
+    last = Str()
+    count = Int()
+
+
+class TestStats(EnamlTestAssistant, unittest.TestCase):
+
+    def setUp(self):
+
+        EnamlTestAssistant.setUp(self)
+
+        enaml_source = """
+from enaml.widgets.api import MainWindow, Field
+
+enamldef MainView(MainWindow):
+    attr model
+    Field:
+        name = 'full_name'
+        text << '{} {}'.format(model.first, model.last)
+    Field:
+        name = 'count'
+        text << str(model.count)
+"""
+        self.model = Model()
+        stats.reset()
+        stats.enable()
+        view, toolkit_view = self.parse_and_create(
+            enaml_source, model=self.model
+        )
+        self.view = view
+
+    def tearDown(self):
+        stats.disable()
+        stats.reset()
+        self.view = None
+        self.model = None
+        EnamlTestAssistant.tearDown(self)
+
+    def test_record_bindings(self):
+        self.model.first = 'John'
+        self.model.last = 'Doe'
+
+        records = {record.binding: record for record in stats.get_stats()}
+        record = records['Field(full_name).text']
+        self.assertEqual(record.evaluations, 3)
+        self.assertEqual(record.notifications, 2)
+        self.assertEqual(record.traced_traits, 2)
+        self.assertGreaterEqual(record.max_time, record.mean_time)
+        self.assertGreaterEqual(record.total_time, record.max_time)
+
+        record = records['Field(count).text']
+        self.assertEqual(record.evaluations, 1)
+        self.assertEqual(record.notifications, 0)
+        self.assertEqual(record.traced_traits, 1)
+
+    def test_disabled(self):
+        stats.disable()
+        stats.reset()
+        self.model.count = 3
+        self.assertEqual(stats.get_stats(), [])
+
+    def test_dump(self):
+        self.model.count = 3
+
+        records = json.loads(stats.dump(format='json'))
+        bindings = sorted(record['binding'] for record in records)
+        self.assertEqual(
+            bindings, ['Field(count).text', 'Field(full_name).text'])
+
+        table = stats.dump().splitlines()
+        self.assertEqual(len(table), 4)
+        self.assertTrue(table[0].startswith('Binding'))
+        self.assertIn('Field(count).text', stats.dump())
+
+        with self.assertRaises(ValueError):
+            stats.dump(format='xml')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -12,11 +12,35 @@
 #
 #----------------------------------------------------------------------------
 import six
+import threading
 import unittest
 
+try:
+    import traits.observation  # noqa
+except ImportError:
+    HAS_OBSERVE = False
+else:
+    HAS_OBSERVE = True
+
+from atom.api import List as AtomList, Value
+from enaml.core.declarative import Declarative, d_
 from traits.api import (
-    Event, Float, HasTraits, Str, List, Dict, Set, Property)
+    Bool, Event, Float, HasTraits, Instance, Str, List, Dict, Set, Property)
+from traits_enaml import stats
 from traits_enaml.testing.enaml_test_assistant import EnamlTestAssistant
+from traits_enaml.trait_operators import (
+    TraitsChainReadHandler, attribute_chain)
+from traits_enaml.traits_tracer import (
+    TraitsObserver, connect_observe, values_equal)
+
+
+class PlainObject(object):
+    value = 'plain'
+
+
+class ChildModel(HasTraits):
+    value = Str()
+    list_values = List(Str)
 
 
 class TraitModel(HasTraits):
@@ -26,6 +50,10 @@ class TraitModel(HasTraits):
     value_update = Str()
     value_simple = Str('simple_text')
     value_notify = Event()
+    value_alternate = Str()
+    switch = Bool(True)
+    child = Instance(ChildModel, ())
+    plain = PlainObject()
     list_values = List(Str)
     dict_values = Dict(Str, Str)
     set_values = Set(Str)
@@ -89,6 +117,24 @@ enamldef MainView(MainWindow):
     Field:
         name = 'test_collection_property_subscribe'
         text << str(model.collection_property_value)
+    Field:
+        name = 'test_switch_subscribe'
+        text << model.value_subscribe if model.switch else model.value_alternate
+    Field:
+        name = 'test_chain_subscribe'
+        text << model.child.value
+    Field:
+        name = 'test_chain_fallback'
+        text << model.plain.value
+    Field:
+        name = 'test_chain_collection'
+        attr values << model.child.list_values
+    Field:
+        name = 'test_list_items'
+        attr values << model.list_values
+        attr items_events = []
+        event values_items
+        values_items :: items_events.append(change['value'])
 """
         self.model = TraitModel()
         view, toolkit_view = self.parse_and_create(
@@ -116,6 +162,26 @@ enamldef MainView(MainWindow):
 
         self.assertEquals(enaml_widget.text, 'updated_trait')
 
+    def test_op_delegate_loopback(self):
+
+        enaml_widget = self.view.find('test_op_delegate')
+        stats.reset()
+        stats.enable()
+        try:
+            enaml_widget.text = 'new_value'
+            # the change of the trait written by the widget is dropped
+            self.assertEqual(stats.get_stats(), [])
+            self.assertEqual(self.model.value_delegate, 'new_value')
+
+            self.model.value_delegate = 'updated_trait'
+            records = stats.get_stats()
+            self.assertEqual(len(records), 1)
+            self.assertEqual(records[0].notifications, 1)
+            self.assertEqual(records[0].evaluations, 1)
+        finally:
+            stats.disable()
+            stats.reset()
+
     def test_op_subscribe(self):
 
         enaml_widget = self.view.find('test_op_subscribe')
@@ -283,3 +349,552 @@ enamldef MainView(MainWindow):
         with self.assertAtomChanges(enaml_widget, 'text', count=1):
             self.model.value = 4.5
             self.assertEquals(enaml_widget.text, u"[4.5, 45.0]")
+
+    def test_switch_subscribe(self):
+
+        enaml_widget = self.view.find('test_switch_subscribe')
+        subscribe_count = self._notifier_count('value_subscribe')
+        alternate_count = self._notifier_count('value_alternate')
+
+        # re-evaluating the expression does not accumulate handlers
+        for index in range(10):
+            self.model.value_subscribe = str(index)
+        self.assertEqual(enaml_widget.text, '9')
+        self.assertEqual(
+            self._notifier_count('value_subscribe'), subscribe_count)
+        self.assertEqual(
+            self._notifier_count('value_alternate'), alternate_count)
+
+        # dependencies which are not traced anymore are unsubscribed
+        with self.assertAtomChanges(enaml_widget, 'text', count=1):
+            self.model.switch = False
+            self.assertEqual(enaml_widget.text, '')
+        self.assertEqual(
+            self._notifier_count('value_subscribe'), subscribe_count - 1)
+        self.assertEqual(
+            self._notifier_count('value_alternate'), alternate_count + 1)
+
+        with self.assertAtomDoesNotChange(enaml_widget, 'text'):
+            self.model.value_subscribe = 'updated_trait'
+
+        with self.assertAtomChanges(enaml_widget, 'text', count=1):
+            self.model.value_alternate = 'alternate'
+            self.assertEqual(enaml_widget.text, 'alternate')
+
+    def test_destroy_unsubscribes(self):
+
+        self.assertGreater(self._notifier_count('value_subscribe'), 0)
+        self.assertGreater(self._notifier_count('value_delegate'), 0)
+        self.assertTrue(
+            self.model.child.trait('value')._notifiers(False))
+
+        self.view.destroy()
+
+        self.assertEqual(self._notifier_count('value_subscribe'), 0)
+        self.assertEqual(self._notifier_count('value_delegate'), 0)
+        self.assertFalse(
+            self.model.child.trait('value')._notifiers(False))
+
+    def test_chain_subscribe(self):
+
+        enaml_widget = self.view.find('test_chain_subscribe')
+        reader = enaml_widget._d_engine._handlers['text'].read_pair.reader
+        self.assertIsInstance(reader, TraitsChainReadHandler)
+
+        with self.assertAtomChanges(enaml_widget, 'text', count=1):
+            self.model.child.value = 'child_value'
+            self.assertEqual(enaml_widget.text, 'child_value')
+
+        old_child = self.model.child
+        with self.assertAtomChanges(enaml_widget, 'text', count=1):
+            self.model.child = ChildModel(value='new_child')
+            self.assertEqual(enaml_widget.text, 'new_child')
+
+        with self.assertAtomDoesNotChange(enaml_widget, 'text'):
+            old_child.value = 'old_child'
+
+        with self.assertAtomChanges(enaml_widget, 'text', count=1):
+            self.model.child.value = 'new_value'
+            self.assertEqual(enaml_widget.text, 'new_value')
+
+    def test_chain_fallback(self):
+
+        enaml_widget = self.view.find('test_chain_fallback')
+        self.assertEqual(enaml_widget.text, 'plain')
+
+    def test_chain_collection(self):
+
+        enaml_widget = self.view.find('test_chain_collection')
+        self.assertIs(enaml_widget.values, self.model.child.list_values)
+
+        with self.assertAtomChanges(enaml_widget, 'values', count=1):
+            self.model.child.list_values = ['1']
+            self.assertEqual(enaml_widget.values, ['1'])
+
+        notifiers = self.model.child.trait('list_values_items')._notifiers(
+            False)
+        self.assertTrue(notifiers)
+
+    def test_list_items(self):
+
+        # the items events are only fired with the items_events option
+        enaml_widget = self.view.find('test_list_items')
+        values = self.model.list_values
+        self.assertIs(enaml_widget.values, values)
+
+        self.model.list_values.append('a')
+        self.assertIs(enaml_widget.values, values)
+        self.assertEqual(enaml_widget.items_events, [])
+
+    def _notifier_count(self, name):
+        notifiers = self.model.trait(name)._notifiers(False)
+        return 0 if notifiers is None else len(notifiers)
+
+
+class ItemsEventsTraitOperatorsTestCase(EnamlTestAssistant,
+                                        unittest.TestCase):
+
+    imports_options = {'items_events': True}
+
+    def setUp(self):
+
+        EnamlTestAssistant.setUp(self)
+
+        enaml_source = """
+from enaml.widgets.api import MainWindow, Field
+
+enamldef MainView(MainWindow):
+    attr model
+    Field:
+        name = 'test_list_items'
+        attr values << model.list_values
+        attr items_events = []
+        event values_items
+        values_items :: items_events.append(change['value'])
+    Field:
+        name = 'test_dict_items'
+        attr values << model.dict_values
+        attr items_events = []
+        event values_items
+        values_items :: items_events.append(change['value'])
+    Field:
+        name = 'test_sorted_items'
+        attr values << sorted(model.list_values)
+        attr items_events = []
+        event values_items
+        values_items :: items_events.append(change['value'])
+"""
+        self.model = TraitModel()
+        view, toolkit_view = self.parse_and_create(
+            enaml_source, model=self.model
+        )
+
+        self.view = view
+
+    def tearDown(self):
+        self.view = None
+        self.model = None
+        EnamlTestAssistant.tearDown(self)
+
+    def test_list_items(self):
+
+        enaml_widget = self.view.find('test_list_items')
+        values = self.model.list_values
+        self.assertIs(enaml_widget.values, values)
+
+        with self.assertAtomDoesNotChange(enaml_widget, 'values'):
+            self.model.list_values.append('a')
+            self.model.list_values[0:1] = ['b', 'c']
+        self.assertIs(enaml_widget.values, values)
+
+        events = enaml_widget.items_events
+        self.assertEqual(len(events), 2)
+        self.assertEqual(
+            (events[0].index, events[0].removed, events[0].added),
+            (0, [], ['a']))
+        self.assertEqual(
+            (events[1].index, events[1].removed, events[1].added),
+            (0, ['a'], ['b', 'c']))
+
+        # replacing the list re-evaluates the expression
+        with self.assertAtomChanges(enaml_widget, 'values', count=1):
+            self.model.list_values = ['d']
+        self.assertEqual(enaml_widget.values, ['d'])
+        self.assertEqual(len(events), 2)
+
+        # the new list is listened to
+        self.model.list_values.append('e')
+        self.assertEqual(len(events), 3)
+
+    def test_dict_items(self):
+
+        enaml_widget = self.view.find('test_dict_items')
+        self.assertEqual(enaml_widget.values, {})
+
+        self.model.dict_values['key'] = 'value'
+
+        events = enaml_widget.items_events
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0].added, {'key': 'value'})
+        self.assertEqual(enaml_widget.values, {'key': 'value'})
+
+    def test_sorted_items(self):
+
+        # the expression does not evaluate to the collection itself, so
+        # the items changes re-evaluate it
+        enaml_widget = self.view.find('test_sorted_items')
+        self.assertEqual(enaml_widget.values, [])
+
+        with self.assertAtomChanges(enaml_widget, 'values', count=1):
+            self.model.list_values.append('b')
+        with self.assertAtomChanges(enaml_widget, 'values', count=1):
+            self.model.list_values.append('a')
+        self.assertEqual(enaml_widget.values, ['a', 'b'])
+        self.assertEqual(enaml_widget.items_events, [])
+
+
+@unittest.skipIf(not HAS_OBSERVE, 'The observe framework is not available')
+class ObserveItemsEventsTraitOperatorsTestCase(
+        ItemsEventsTraitOperatorsTestCase):
+
+    imports_options = {'items_events': True, 'observe': True}
+
+
+class TestAttributeChain(unittest.TestCase):
+
+    def test_attribute_chain(self):
+        code = compile('model.child.value', '<test>', 'eval')
+        self.assertEqual(attribute_chain(code), ('model', ('child', 'value')))
+
+    def test_not_attribute_chain(self):
+        for source in ('model', 'str(model.value)', 'model.values[0]',
+                       'model.value + model.other'):
+            code = compile(source, '<test>', 'eval')
+            self.assertIsNone(attribute_chain(code))
+
+
+class CoalescedModel(HasTraits):
+    first = Str()
+    last = Str()
+    evaluations = List(Str)
+    threads = List()
+
+    def full_name(self, first, last):
+        name = '{} {}'.format(first, last)
+        self.evaluations.append(name)
+        self.threads.append(threading.current_thread())
+        return name
+
+
+class CoalescedTraitOperatorsTestCase(EnamlTestAssistant, unittest.TestCase):
+
+    imports_options = {'coalesce': True}
+
+    def setUp(self):
+
+        EnamlTestAssistant.setUp(self)
+
+        enaml_source = """
+from enaml.widgets.api import MainWindow, Field
+
+enamldef MainView(MainWindow):
+    attr model
+    Field:
+        name = 'test_coalesced_subscribe'
+        text << model.full_name(model.first, model.last)
+    Field:
+        name = 'test_coalesced_delegate'
+        text := model.first
+"""
+        self.model = CoalescedModel()
+        view, toolkit_view = self.parse_and_create(
+            enaml_source, model=self.model
+        )
+
+        self.view = view
+
+    def tearDown(self):
+        self.view = None
+        self.model = None
+        EnamlTestAssistant.tearDown(self)
+
+    def test_coalesced_subscribe(self):
+
+        enaml_widget = self.view.find('test_coalesced_subscribe')
+        self.assertEqual(self.model.evaluations, [' '])
+
+        with self.assertAtomDoesNotChange(enaml_widget, 'text'):
+            self.model.trait_set(first='John', last='Doe')
+
+        with self.assertAtomChanges(enaml_widget, 'text', count=1):
+            with self.event_loop():
+                pass
+
+        self.assertEqual(enaml_widget.text, 'John Doe')
+        self.assertEqual(self.model.evaluations, [' ', 'John Doe'])
+
+    def test_coalesced_delegate(self):
+
+        enaml_widget = self.view.find('test_coalesced_delegate')
+
+        with self.assertTraitChanges(self.model, 'first', count=1):
+            enaml_widget.text = 'new_value'
+        self.assertEqual(self.model.first, 'new_value')
+
+        self.model.first = 'updated_trait'
+        self.model.first = 'updated_trait_again'
+        with self.event_loop():
+            pass
+        self.assertEqual(enaml_widget.text, 'updated_trait_again')
+
+    def test_coalesced_delegate_loopback(self):
+
+        enaml_widget = self.view.find('test_coalesced_delegate')
+        stats.reset()
+        stats.enable()
+        try:
+            enaml_widget.text = 'new_value'
+            with self.event_loop():
+                pass
+            # no update of the widget is scheduled by its own write
+            records = {
+                record.binding: record for record in stats.get_stats()}
+            self.assertNotIn('Field(test_coalesced_delegate).text', records)
+            self.assertEqual(self.model.first, 'new_value')
+        finally:
+            stats.disable()
+            stats.reset()
+
+
+class ThrottledTraitOperatorsTestCase(EnamlTestAssistant, unittest.TestCase):
+
+    imports_options = {'throttle': 200}
+
+    def setUp(self):
+
+        EnamlTestAssistant.setUp(self)
+
+        enaml_source = """
+from enaml.widgets.api import MainWindow, Field
+
+enamldef MainView(MainWindow):
+    attr model
+    Field:
+        name = 'test_throttled_subscribe'
+        text << model.full_name(model.first, model.last)
+"""
+        self.model = CoalescedModel()
+        view, toolkit_view = self.parse_and_create(
+            enaml_source, model=self.model
+        )
+
+        self.view = view
+
+    def tearDown(self):
+        self.view = None
+        self.model = None
+        EnamlTestAssistant.tearDown(self)
+
+    def test_throttled_subscribe(self):
+
+        enaml_widget = self.view.find('test_throttled_subscribe')
+
+        # the first change is delivered right away
+        with self.assertAtomChanges(enaml_widget, 'text', count=1):
+            self.model.first = 'John'
+        self.assertEqual(enaml_widget.text, 'John ')
+
+        # the following ones are throttled
+        def condition():
+            return enaml_widget.text == 'John Doe'
+
+        with self.event_loop_until_condition(condition, timeout=5.0):
+            with self.assertAtomDoesNotChange(enaml_widget, 'text'):
+                self.model.last = 'Do'
+                self.model.last = 'Doe'
+        self.assertEqual(self.model.evaluations, [' ', 'John ', 'John Doe'])
+
+
+class UIDispatchTraitOperatorsTestCase(EnamlTestAssistant, unittest.TestCase):
+
+    imports_options = {'dispatch': 'ui'}
+
+    def setUp(self):
+
+        EnamlTestAssistant.setUp(self)
+
+        enaml_source = """
+from enaml.widgets.api import MainWindow, Field
+
+enamldef MainView(MainWindow):
+    attr model
+    Field:
+        name = 'test_ui_dispatch_subscribe'
+        text << model.full_name(model.first, model.last)
+"""
+        self.model = CoalescedModel()
+        view, toolkit_view = self.parse_and_create(
+            enaml_source, model=self.model
+        )
+
+        self.view = view
+
+    def tearDown(self):
+        self.view = None
+        self.model = None
+        EnamlTestAssistant.tearDown(self)
+
+    def test_same_thread_change(self):
+
+        enaml_widget = self.view.find('test_ui_dispatch_subscribe')
+
+        with self.assertAtomChanges(enaml_widget, 'text', count=1):
+            self.model.first = 'John'
+        self.assertEqual(enaml_widget.text, 'John ')
+
+    def test_worker_thread_change(self):
+
+        enaml_widget = self.view.find('test_ui_dispatch_subscribe')
+
+        def worker():
+            self.model.first = 'John'
+            self.model.last = 'Do'
+            self.model.last = 'Doe'
+
+        with self.assertAtomDoesNotChange(enaml_widget, 'text'):
+            thread = threading.Thread(target=worker)
+            thread.start()
+            thread.join()
+
+        with self.assertAtomChanges(enaml_widget, 'text', count=1):
+            with self.event_loop():
+                pass
+
+        self.assertEqual(enaml_widget.text, 'John Doe')
+        self.assertEqual(self.model.evaluations, [' ', 'John Doe'])
+        main_thread = threading.current_thread()
+        self.assertEqual(self.model.threads, [main_thread, main_thread])
+
+    def test_observer_created_on_worker_thread(self):
+
+        observers = []
+
+        def worker():
+            observers.append(TraitsObserver(self.view, 'title', dispatch='ui'))
+
+        thread = threading.Thread(target=worker)
+        thread.start()
+        thread.join()
+
+        # the notifications are dispatched to the GUI thread, not to the
+        # thread which created the observer
+        main_thread = threading.current_thread()
+        self.assertEqual(observers[0].thread_id, main_thread.ident)
+
+    def test_invalid_dispatch(self):
+
+        with self.assertRaises(ValueError):
+            TraitsObserver(self.view, 'title', dispatch='other')
+
+
+class Recorder(Declarative):
+    """ A declarative object recording the assignments of its value.
+
+    """
+    value = d_(Value())
+
+    writes = AtomList()
+
+    def _post_setattr_value(self, old, new):
+        self.writes.append(new)
+
+
+class SkipEqualModel(HasTraits):
+    first = Str()
+    last = Str()
+
+
+class SkipEqualTraitOperatorsTestCase(EnamlTestAssistant, unittest.TestCase):
+
+    imports_options = {'skip_equal': True}
+
+    def setUp(self):
+
+        EnamlTestAssistant.setUp(self)
+
+        enaml_source = """
+from enaml.widgets.api import MainWindow, Field
+from traits_enaml.tests.test_trait_operators import Recorder
+
+enamldef MainView(MainWindow):
+    attr model
+    Recorder:
+        name = 'test_skip_equal_subscribe'
+        value << model.first[:1]
+    Field:
+        name = 'test_skip_equal_delegate'
+        text := model.last
+"""
+        self.model = SkipEqualModel()
+        view, toolkit_view = self.parse_and_create(
+            enaml_source, model=self.model
+        )
+
+        self.view = view
+
+    def tearDown(self):
+        self.view = None
+        self.model = None
+        EnamlTestAssistant.tearDown(self)
+
+    def test_skip_equal_subscribe(self):
+
+        recorder = self.view.find('test_skip_equal_subscribe')
+        # the initial value is not assigned, it is the default value
+        self.assertEqual(recorder.value, '')
+        self.assertEqual(recorder.writes, [])
+
+        self.model.first = 'John'
+        self.assertEqual(recorder.writes, ['J'])
+        self.model.first = 'Jane'
+        self.assertEqual(recorder.writes, ['J'])
+        self.model.first = 'Mary'
+        self.assertEqual(recorder.writes, ['J', 'M'])
+
+    def test_values_equal(self):
+
+        class Incomparable(object):
+            def __eq__(self, other):
+                raise ValueError('ambiguous')
+
+        self.assertTrue(values_equal('a', 'a'))
+        self.assertTrue(values_equal([1], [1]))
+        self.assertFalse(values_equal(1, 2))
+        # the same list may have been changed in place
+        values = [1]
+        self.assertFalse(values_equal(values, values))
+        self.assertFalse(values_equal(Incomparable(), Incomparable()))
+
+    def test_skip_equal_delegate(self):
+
+        enaml_widget = self.view.find('test_skip_equal_delegate')
+
+        enaml_widget.text = 'new_value'
+        self.assertEqual(self.model.last, 'new_value')
+
+        # the value written by the widget is not the last computed one
+        with self.assertAtomChanges(enaml_widget, 'text', count=1):
+            self.model.last = ''
+        self.assertEqual(enaml_widget.text, '')
+
+
+@unittest.skipIf(not HAS_OBSERVE, 'The observe framework is not available')
+class ObserveTraitOperatorsTestCase(TraitOperatorsTestCase):
+
+    imports_options = {'observe': True}
+
+    def test_observe_subscription(self):
+
+        enaml_widget = self.view.find('test_op_subscribe')
+        observer = enaml_widget._d_storage['_[text|trace]']
+        self.assertIs(observer.connect, connect_observe)
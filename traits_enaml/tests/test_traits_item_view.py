@@ -0,0 +1,342 @@
+#----------------------------------------------------------------------------
+#
+#  Copyright (c) 2013-14, Enthought, Inc.
+#  All rights reserved.
+#
+#  This software is provided without warranty under the terms of the BSD
+#  license included in /LICENSE.txt and may be redistributed only
+#  under the conditions described in the aforementioned license.  The license
+#  is also available online at http://www.enthought.com/licenses/BSD.txt
+#
+#  Thanks for using Enthought open source!
+#
+#----------------------------------------------------------------------------
+import datetime
+import threading
+import unittest
+
+from enaml.qt.QtCore import QDate, Qt
+from traits.api import (
+    Bool, Button, Date, Enum, Float, HasTraits, Int, List, Range, Str)
+
+from traits_enaml.compat import (
+    QComboBox, QLineEdit, QSpinBox, QStyleOptionViewItem)
+from traits_enaml.testing.enaml_test_assistant import EnamlTestAssistant
+from traits_enaml.widgets.auto_view import (
+    AutoWindow, auto_table, auto_window, _model_editors)
+from traits_enaml.widgets.traits_item_view import (
+    TraitsFormModel, TraitsItemDelegate)
+
+
+class Model(HasTraits):
+
+    flag = Bool(True)
+    fire = Button('Fire')
+    count = Int(3, tooltip='The count')
+    ratio = Float(0.5)
+    choice = Enum('a', 'b', 'c')
+    level = Range(low=0, high=10)
+    name = Str('name')
+    day = Date(datetime.date(2014, 1, 2))
+    values = List([1, 2])
+
+    fired = Int()
+
+    def _fire_fired(self):
+        self.fired += 1
+
+
+class TestTraitsFormModel(EnamlTestAssistant, unittest.TestCase):
+
+    def setUp(self):
+        EnamlTestAssistant.setUp(self)
+        self.model = Model()
+        descs = [desc for desc, editor in _model_editors(self.model)]
+        self.item_model = TraitsFormModel(self.model, descs)
+        self.rows = dict((desc.name, row) for row, desc in enumerate(descs))
+
+    def tearDown(self):
+        self.item_model.dispose()
+        self.item_model = None
+        self.model = None
+        EnamlTestAssistant.tearDown(self)
+
+    def index(self, name, column=1):
+        return self.item_model.index(self.rows[name], column)
+
+    def test_data(self):
+        item_model = self.item_model
+        self.assertEqual(item_model.rowCount(), len(self.rows))
+        self.assertEqual(item_model.columnCount(), 2)
+        self.assertEqual(item_model.data(self.index('count', 0)), 'Count')
+        self.assertEqual(item_model.data(self.index('count')), '3')
+        self.assertEqual(item_model.data(self.index('fire')), 'Fire')
+        self.assertEqual(item_model.data(self.index('day')), '2014-01-02')
+        self.assertEqual(
+            item_model.data(self.index('count'), Qt.ToolTipRole), 'The count')
+        self.assertEqual(
+            item_model.data(self.index('flag'), Qt.CheckStateRole),
+            Qt.Checked)
+
+    def test_set_data(self):
+        item_model = self.item_model
+        self.assertTrue(item_model.setData(self.index('count'), 5))
+        self.assertEqual(self.model.count, 5)
+        self.assertFalse(item_model.setData(self.index('count'), 'invalid'))
+        self.assertEqual(self.model.count, 5)
+
+        item_model.setData(self.index('day'), QDate(2015, 3, 4))
+        self.assertEqual(self.model.day, datetime.date(2015, 3, 4))
+
+        item_model.setData(self.index('flag'), Qt.Unchecked, Qt.CheckStateRole)
+        self.assertFalse(self.model.flag)
+
+    def test_set_text_data(self):
+        item_model = self.item_model
+        self.assertEqual(
+            item_model.data(self.index('ratio'), Qt.EditRole), '0.5')
+        self.assertTrue(
+            item_model.setData(self.index('ratio'), '0.123456789'))
+        self.assertEqual(self.model.ratio, 0.123456789)
+        self.assertFalse(item_model.setData(self.index('ratio'), 'invalid'))
+        self.assertEqual(self.model.ratio, 0.123456789)
+
+        self.assertEqual(item_model.data(self.index('values')), '[1, 2]')
+        self.assertEqual(
+            item_model.data(self.index('values'), Qt.EditRole), '[1, 2]')
+        self.assertTrue(item_model.setData(self.index('values'), '[3]'))
+        self.assertEqual(self.model.values, [3])
+        self.assertFalse(item_model.setData(self.index('values'), '[3'))
+        self.assertFalse(item_model.setData(self.index('values'), '3'))
+        self.assertFalse(
+            item_model.setData(self.index('values'), '{[1]: 2}'))
+        self.assertEqual(self.model.values, [3])
+
+    def test_delegate_invalid_literal(self):
+        delegate = TraitsItemDelegate()
+        option = QStyleOptionViewItem()
+        editor = delegate.createEditor(None, option, self.index('values'))
+        editor.setText('{[1]: 2}')
+        delegate.setModelData(editor, self.item_model, self.index('values'))
+        self.assertEqual(self.model.values, [1, 2])
+
+    def test_flags(self):
+        item_model = self.item_model
+        self.assertTrue(
+            item_model.flags(self.index('name')) & Qt.ItemIsEditable)
+        self.assertTrue(
+            item_model.flags(self.index('flag')) & Qt.ItemIsUserCheckable)
+        self.assertTrue(
+            item_model.flags(self.index('values')) & Qt.ItemIsEditable)
+        self.assertFalse(
+            item_model.flags(self.index('fire')) & Qt.ItemIsEditable)
+        self.model.values = list(range(2000))
+        self.assertFalse(
+            item_model.flags(self.index('values')) & Qt.ItemIsEditable)
+        self.assertFalse(
+            item_model.flags(self.index('name', 0)) & Qt.ItemIsEditable)
+
+    def test_trait_change(self):
+        changes = []
+        self.item_model.dataChanged.connect(
+            lambda top_left, bottom_right: changes.append(top_left.row()))
+
+        self.model.name = 'other'
+        self.assertEqual(changes, [self.rows['name']])
+
+        self.item_model.dispose()
+        self.model.name = 'again'
+        self.assertEqual(changes, [self.rows['name']])
+
+    def test_trait_change_on_worker_thread(self):
+        changes = []
+        self.item_model.dataChanged.connect(
+            lambda top_left, bottom_right: changes.append(
+                (top_left.row(), threading.current_thread())))
+
+        thread = threading.Thread(target=setattr, args=(
+            self.model, 'name', 'other'))
+        thread.start()
+        thread.join()
+        self.assertEqual(changes, [])
+        with self.event_loop():
+            pass
+        self.assertEqual(
+            changes, [(self.rows['name'], threading.current_thread())])
+
+    def test_activate_button(self):
+        self.item_model.activate(self.index('fire'))
+        self.assertEqual(self.model.fired, 1)
+
+    def test_delegate_editors(self):
+        delegate = TraitsItemDelegate()
+        option = QStyleOptionViewItem()
+
+        editor = delegate.createEditor(None, option, self.index('choice'))
+        self.assertIsInstance(editor, QComboBox)
+        self.model.choice = 'b'
+        delegate.setEditorData(editor, self.index('choice'))
+        self.assertEqual(editor.currentIndex(), 1)
+        editor.setCurrentIndex(2)
+        delegate.setModelData(editor, self.item_model, self.index('choice'))
+        self.assertEqual(self.model.choice, 'c')
+
+        editor = delegate.createEditor(None, option, self.index('level'))
+        self.assertIsInstance(editor, QSpinBox)
+        self.assertEqual((editor.minimum(), editor.maximum()), (0, 10))
+
+        # the floats are not rounded by the editor
+        editor = delegate.createEditor(None, option, self.index('ratio'))
+        self.assertIsInstance(editor, QLineEdit)
+        self.model.ratio = 0.123456789
+        delegate.setEditorData(editor, self.index('ratio'))
+        self.assertEqual(editor.text(), '0.123456789')
+        delegate.setModelData(editor, self.item_model, self.index('ratio'))
+        self.assertEqual(self.model.ratio, 0.123456789)
+
+        editor = delegate.createEditor(None, option, self.index('values'))
+        self.assertIsInstance(editor, QLineEdit)
+        delegate.setEditorData(editor, self.index('values'))
+        self.assertEqual(editor.text(), '[1, 2]')
+        editor.setText('[1, 2, 3]')
+        delegate.setModelData(editor, self.item_model, self.index('values'))
+        self.assertEqual(self.model.values, [1, 2, 3])
+
+
+class TestVirtualAutoView(EnamlTestAssistant, unittest.TestCase):
+
+    def test_virtual_auto_window(self):
+        model = Model()
+        window = auto_window(model, virtual=True)
+        with self.event_loop():
+            window.show()
+
+        form_view = self.find_enaml_widget(window, 'TraitsFormView')
+        self.assertEqual(form_view.item_model.rowCount(), 10)
+        # no editor widgets are created until a cell is edited
+        table = form_view.proxy.widget
+        self.assertEqual(table.findChildren(QLineEdit), [])
+
+        window.destroy()
+        self.assertIsNone(form_view.item_model)
+
+    def test_virtual_model_change(self):
+        model = Model()
+        window = auto_window(model, virtual=True)
+        with self.event_loop():
+            window.show()
+
+        form_view = self.find_enaml_widget(window, 'TraitsFormView')
+        item_model = form_view.item_model
+        other = Model(count=7)
+        form_view.model = other
+        self.assertIsNot(form_view.item_model, item_model)
+        self.assertIs(form_view.proxy.widget.model(), form_view.item_model)
+        descs = form_view.trait_descs
+        row = [desc.name for desc in descs].index('count')
+        index = form_view.item_model.index(row, 1)
+        self.assertEqual(form_view.item_model.data(index), '7')
+        # the previous model is not listened to anymore
+        self.assertFalse(any(
+            getattr(notifier, 'name', None) == '_trait_changed'
+            for notifier in model._notifiers(True)))
+
+        form_view.trait_descs = descs[:2]
+        self.assertEqual(form_view.item_model.rowCount(), 2)
+        window.destroy()
+
+
+class TestAutoTable(EnamlTestAssistant, unittest.TestCase):
+
+    def setUp(self):
+        EnamlTestAssistant.setUp(self)
+        self.models = [Model(count=index) for index in range(1000)]
+        self.window = AutoWindow(view=auto_table(self.models))
+        self.window.initial_size = (400, 300)
+        with self.event_loop(repeat=5):
+            self.window.show()
+        table_view = self.find_enaml_widget(self.window, 'TraitsTableView')
+        self.item_model = table_view.item_model
+        self.table = table_view.proxy.widget
+
+    def tearDown(self):
+        self.window.destroy()
+        self.table = None
+        self.item_model = None
+        self.window = None
+        self.models = None
+        EnamlTestAssistant.tearDown(self)
+
+    def test_table_shape(self):
+        item_model = self.item_model
+        self.assertEqual(item_model.rowCount(), 1000)
+        self.assertEqual(item_model.columnCount(), 10)
+        self.assertEqual(
+            item_model.headerData(2, Qt.Horizontal), 'Count')
+        self.assertEqual(item_model.data(item_model.index(7, 2)), '7')
+
+    def test_visible_rows_listeners(self):
+        listened = self.item_model._listened
+        self.assertGreater(len(listened), 0)
+        self.assertLess(len(listened), 1000)
+        self.assertTrue(self._is_listened(self.models[0]))
+        self.assertFalse(self._is_listened(self.models[-1]))
+
+        changes = []
+        self.item_model.dataChanged.connect(
+            lambda top_left, bottom_right: changes.append(
+                (top_left.row(), top_left.column())))
+        self.models[0].count = -1
+        self.assertEqual(changes, [(0, 2)])
+
+        scroll_bar = self.table.verticalScrollBar()
+        scroll_bar.setValue(scroll_bar.maximum())
+        self.assertFalse(self._is_listened(self.models[0]))
+        self.assertTrue(self._is_listened(self.models[-1]))
+
+    def test_same_object_in_several_rows(self):
+        model = Model()
+        self.window.view = auto_table([model, Model(), model])
+        with self.event_loop(repeat=5):
+            pass
+        table_view = self.find_enaml_widget(self.window, 'TraitsTableView')
+        item_model = table_view.item_model
+        changes = []
+        item_model.dataChanged.connect(
+            lambda top_left, bottom_right: changes.append(
+                (top_left.row(), top_left.column())))
+
+        model.count = 7
+        self.assertEqual(changes, [(0, 2), (2, 2)])
+
+        # the object stays listened to while one of its rows is visible
+        item_model.set_visible_rows(1, 2)
+        self.assertTrue(self._is_listened(model))
+        item_model.set_visible_rows(1, 1)
+        self.assertFalse(self._is_listened(model))
+
+    def test_models_change(self):
+        table_view = self.find_enaml_widget(self.window, 'TraitsTableView')
+        models = [Model(count=index) for index in range(3)]
+        table_view.models = models
+        item_model = table_view.item_model
+        self.assertIsNot(item_model, self.item_model)
+        self.assertIs(self.table.model(), item_model)
+        self.assertEqual(item_model.rowCount(), 3)
+        self.assertFalse(
+            any(self._is_listened(model) for model in self.models))
+        self.assertTrue(self._is_listened(models[0]))
+
+        table_view.trait_descs = table_view.trait_descs[:1]
+        self.assertEqual(table_view.item_model.columnCount(), 1)
+
+    def test_dispose(self):
+        self.window.destroy()
+        self.assertFalse(
+            any(self._is_listened(model) for model in self.models))
+
+    def _is_listened(self, model):
+        # the wrappers of the bound methods keep the name of the method
+        return any(
+            getattr(notifier, 'name', None) == '_trait_changed'
+            for notifier in model._notifiers(True))
@@ -0,0 +1,118 @@
+#----------------------------------------------------------------------------
+#
+#  Copyright (c) 2013-14, Enthought, Inc.
+#  All rights reserved.
+#
+#  This software is provided without warranty under the terms of the BSD
+#  license included in /LICENSE.txt and may be redistributed only
+#  under the conditions described in the aforementioned license.  The license
+#  is also available online at http://www.enthought.com/licenses/BSD.txt
+#
+#  Thanks for using Enthought open source!
+#
+#----------------------------------------------------------------------------
+import unittest
+
+from traits.api import HasTraits, List, Str
+
+from traits_enaml.testing.enaml_test_assistant import EnamlTestAssistant
+
+
+class Model(HasTraits):
+
+    values = List(Str)
+
+
+class TestTraitsLooper(EnamlTestAssistant, unittest.TestCase):
+
+    imports_options = {'items_events': True}
+
+    def setUp(self):
+
+        EnamlTestAssistant.setUp(self)
+
+        enaml_source = """
+from enaml.widgets.api import MainWindow, Container, Field
+from traits_enaml.widgets.traits_looper import TraitsLooper
+
+enamldef MainView(MainWindow): win:
+    attr model
+
+    Container: container:
+        Field:
+            name = 'first'
+        TraitsLooper: looper:
+            iterable << model.values
+            Field:
+                text << '{}:{}'.format(loop.index, loop.item)
+        Field:
+            name = 'last'
+"""
+
+        self.model = Model(values=['a', 'b', 'c'])
+
+        view, toolkit_view = self.parse_and_create(enaml_source,
+                                                   model=self.model)
+
+        self.view = view
+        self.container = self.find_enaml_widget(view, 'Container')
+        self.looper = self.find_enaml_widget(view, 'TraitsLooper')
+
+    def tearDown(self):
+        self.looper = None
+        self.container = None
+        self.view = None
+        self.model = None
+
+        EnamlTestAssistant.tearDown(self)
+
+    def get_texts(self):
+        return [child.text for child in self.container.widgets()]
+
+    def test_initial_items(self):
+        self.assertEqual(
+            self.get_texts(), ['', '0:a', '1:b', '2:c', ''])
+
+    def test_append(self):
+        fields = self.looper.pattern_items()
+
+        self.model.values.append('d')
+
+        self.assertEqual(
+            self.get_texts(), ['', '0:a', '1:b', '2:c', '3:d', ''])
+        self.assertEqual(self.looper.pattern_items()[:3], fields)
+
+    def test_insert_and_remove(self):
+        fields = self.looper.pattern_items()
+
+        self.model.values.insert(1, 'x')
+        self.assertEqual(
+            self.get_texts(), ['', '0:a', '1:x', '2:b', '3:c', ''])
+
+        del self.model.values[0]
+        self.assertEqual(
+            self.get_texts(), ['', '0:x', '1:b', '2:c', ''])
+        self.assertTrue(fields[0].is_destroyed)
+        self.assertEqual(self.looper.pattern_items()[1:], fields[1:])
+
+    def test_reorder_reuses_children(self):
+        fields = self.looper.pattern_items()
+
+        self.model.values.reverse()
+
+        self.assertEqual(
+            self.get_texts(), ['', '0:c', '1:b', '2:a', ''])
+        self.assertEqual(self.looper.pattern_items(), fields[::-1])
+
+    def test_replace_list(self):
+        fields = self.looper.pattern_items()
+
+        self.model.values = ['y', 'z']
+
+        self.assertEqual(self.get_texts(), ['', '0:y', '1:z', ''])
+        self.assertTrue(all(field.is_destroyed for field in fields))
+
+    def test_extended_slice(self):
+        del self.model.values[::2]
+
+        self.assertEqual(self.get_texts(), ['', '0:b', ''])
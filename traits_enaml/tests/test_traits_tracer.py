@@ -0,0 +1,147 @@
+#----------------------------------------------------------------------------
+#
+#  Copyright (c) 2013-14, Enthought, Inc.
+#  All rights reserved.
+#
+#  This software is provided without warranty under the terms of the BSD
+#  license included in /LICENSE.txt and may be redistributed only
+#  under the conditions described in the aforementioned license.  The license
+#  is also available online at http://www.enthought.com/licenses/BSD.txt
+#
+#  Thanks for using Enthought open source!
+#
+#----------------------------------------------------------------------------
+import gc
+import unittest
+
+try:
+    import traits.observation  # noqa
+except ImportError:
+    HAS_OBSERVE = False
+else:
+    HAS_OBSERVE = True
+
+from traits.api import Any, Disallow, HasTraits, List, Str
+
+from traits_enaml import traits_tracer
+from traits_enaml.traits_tracer import (
+    _observer_expressions, _traced_names_cache, shared_observer_expression,
+    traced_names)
+
+
+class Model(HasTraits):
+    value = Str()
+    values = List(Str)
+    anything = Any()
+
+    def method(self):
+        pass
+
+
+class StrictModel(HasTraits):
+    _ = Disallow
+    value = Str()
+
+
+class TestTracedNames(unittest.TestCase):
+
+    def setUp(self):
+        _traced_names_cache.clear()
+
+    def tearDown(self):
+        _traced_names_cache.clear()
+
+    def test_traced_names(self):
+        model = Model()
+        self.assertEqual(traced_names(model, 'value'), ('value',))
+        self.assertEqual(
+            traced_names(model, 'values'), ('values', 'values_items'))
+        self.assertEqual(traced_names(model, 'method'), ())
+        self.assertEqual(traced_names(StrictModel(), 'other'), ())
+
+    def test_traced_names_cached_per_class(self):
+        model = Model()
+        names = traced_names(model, 'values')
+        self.assertIn('values', _traced_names_cache[Model])
+
+        # the cached result is shared with the other instances, even
+        # when the trait has been cloned to hold instance notifiers.
+        other = Model()
+        other.on_trait_change(lambda: None, 'values')
+        self.assertIs(traced_names(other, 'values'), names)
+
+    def test_traced_names_add_trait(self):
+        model = Model()
+        self.assertEqual(traced_names(model, 'anything'), ('anything',))
+        self.assertEqual(traced_names(model, 'extra'), ())
+
+        other = Model()
+        other.add_trait('anything', List(Str))
+        other.add_trait('extra', Str())
+        self.assertEqual(
+            traced_names(other, 'anything'), ('anything', 'anything_items'))
+        self.assertEqual(traced_names(other, 'extra'), ('extra',))
+
+        # instance traits do not leak into the class cache
+        self.assertEqual(traced_names(model, 'anything'), ('anything',))
+        self.assertEqual(traced_names(model, 'extra'), ())
+        self.assertEqual(traced_names(Model(), 'extra'), ())
+
+    def test_traced_names_add_class_trait(self):
+        class Other(HasTraits):
+            value = Str()
+
+        model = Other()
+        self.assertEqual(traced_names(model, 'extra'), ())
+        Other.add_class_trait('extra', List(Str))
+        self.assertEqual(
+            traced_names(model, 'extra'), ('extra', 'extra_items'))
+
+    def test_traced_names_cache_holds_classes_weakly(self):
+        class Other(HasTraits):
+            value = Str()
+
+        traced_names(Other(), 'value')
+        self.assertIn(Other, _traced_names_cache)
+        del Other
+        gc.collect()
+        self.assertEqual(len(_traced_names_cache), 0)
+
+
+@unittest.skipIf(not HAS_OBSERVE, 'The observe framework is not available')
+class TestSharedObserverExpression(unittest.TestCase):
+
+    def setUp(self):
+        self.cache_size = traits_tracer.OBSERVER_EXPRESSIONS_CACHE_SIZE
+        _observer_expressions.clear()
+
+    def tearDown(self):
+        traits_tracer.OBSERVER_EXPRESSIONS_CACHE_SIZE = self.cache_size
+        _observer_expressions.clear()
+
+    def test_shared_expression(self):
+        expression = shared_observer_expression('child.value')
+        self.assertIs(shared_observer_expression('child.value'), expression)
+
+        model = Model()
+        changes = []
+        traits_tracer.connect_observe(model, 'value', changes.append)
+        model.value = 'new'
+        self.assertEqual(len(changes), 1)
+        traits_tracer.connect_observe(
+            model, 'value', changes.append, remove=True)
+        model.value = 'other'
+        self.assertEqual(len(changes), 1)
+
+    def test_cache_is_bounded(self):
+        traits_tracer.OBSERVER_EXPRESSIONS_CACHE_SIZE = 2
+        first = shared_observer_expression('a')
+        shared_observer_expression('b')
+        # using 'a' again makes 'b' the least recently used expression
+        self.assertIs(shared_observer_expression('a'), first)
+        shared_observer_expression('c')
+        self.assertEqual(list(_observer_expressions), ['a', 'c'])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -15,10 +15,13 @@
 Unit tests for the LoopbackGuard class and LoopbackContext context manager.
 
 """
+import threading
 import unittest
 
 from traits.api import HasTraits, Instance, List, on_trait_change
-from traits_enaml.utils import LoopbackGuard, LoopbackContext
+from traits_enaml.utils import (
+    LoopbackGuard, LoopbackContext, LoopbackItemContext,
+    ThreadLocalLoopbackGuard)
 
 
 class TestLoopbackGuard(unittest.TestCase):
@@ -47,6 +50,35 @@ class TestLoopbackGuard(unittest.TestCase):
 
         self.assertIsNone(guard.locked_items)
 
+    def test_acquire_release_item(self):
+        guard = LoopbackGuard()
+
+        guard.acquire_item('item')
+        guard.acquire_item('item')
+        locked_items = guard.locked_items
+        self.assertDictEqual(locked_items, {'item': 2})
+
+        guard.release_item('item')
+        self.assertIn('item', guard)
+        guard.release_item('item')
+        self.assertNotIn('item', guard)
+        self.assertIsNone(guard.locked_items)
+
+        # releasing an item which is not locked does nothing
+        guard.release_item('item')
+        self.assertIsNone(guard.locked_items)
+
+        # the dictionary of the counts is reused
+        guard.acquire(['other'])
+        self.assertIs(guard.locked_items, locked_items)
+        guard.release(['other'])
+        self.assertIsNone(guard.locked_items)
+
+    def test_acquire_no_items(self):
+        guard = LoopbackGuard()
+        guard.acquire([])
+        self.assertIsNone(guard.locked_items)
+
 
 class TestLoopbackContext(unittest.TestCase):
     """
@@ -83,6 +115,90 @@ class TestLoopbackContext(unittest.TestCase):
         cm = guard(*items)
         self._check_loopback_context_manager(cm, guard, items)
 
+    def test_loopback_item_context_call(self):
+        # Calling the guard with a single item returns the single item
+        # context manager.
+        guard = LoopbackGuard()
+        cm = guard('a')
+        self.assertIsInstance(cm, LoopbackItemContext)
+        self._check_loopback_context_manager(cm, guard, ['a'])
+
+    def test_loopback_item_context_reuse(self):
+        # A context manager can be reused and nested.
+        guard = LoopbackGuard()
+        cm = LoopbackItemContext(guard, 'a')
+        for _ in range(2):
+            with cm:
+                with cm:
+                    self.assertEqual(guard.locked_items, {'a': 2})
+                self.assertIn('a', guard)
+            self.assertIsNone(guard.locked_items)
+
+    def test_loopback_item_context_exception(self):
+        guard = LoopbackGuard()
+        with self.assertRaises(ValueError):
+            with guard('a'):
+                raise ValueError()
+        self.assertNotIn('a', guard)
+
+
+class TestThreadLocalLoopbackGuard(unittest.TestCase):
+    """
+    Unit tests that exercise the ThreadLocalLoopbackGuard class.
+
+    """
+    def test_context(self):
+        guard = ThreadLocalLoopbackGuard()
+        with guard('a', 'b'):
+            self.assertDictEqual(guard.locked_items, {'a': 1, 'b': 1})
+            with guard('a'):
+                self.assertDictEqual(guard.locked_items, {'a': 2, 'b': 1})
+            self.assertIn('a', guard)
+        self.assertIsNone(guard.locked_items)
+        self.assertNotIn('a', guard)
+
+    def test_items_are_thread_local(self):
+        guard = ThreadLocalLoopbackGuard()
+        results = []
+
+        def worker():
+            results.append('a' in guard)
+            with guard('b'):
+                results.append(sorted(guard.locked_items))
+
+        with guard('a'):
+            thread = threading.Thread(target=worker)
+            thread.start()
+            thread.join()
+            self.assertDictEqual(guard.locked_items, {'a': 1})
+
+        self.assertEqual(results, [False, ['b']])
+        self.assertIsNone(guard.locked_items)
+
+    def test_concurrent_updates(self):
+        guard = ThreadLocalLoopbackGuard()
+        errors = []
+        start = threading.Event()
+
+        def worker(item):
+            start.wait()
+            for _ in range(1000):
+                with guard(item):
+                    if guard.locked_items != {item: 1}:
+                        errors.append(dict(guard.locked_items))
+            if guard.locked_items is not None:
+                errors.append(guard.locked_items)
+
+        threads = [
+            threading.Thread(target=worker, args=(index,))
+            for index in range(4)]
+        for thread in threads:
+            thread.start()
+        start.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+
 
 class Dummy(object):
     pass
@@ -11,13 +11,25 @@
 #  Thanks for using Enthought open source!
 #
 #----------------------------------------------------------------------------
+import dis
+from functools import partial
+from timeit import default_timer
+
+from atom.api import Bool, Callable, Event, Str, Tuple
+from traits.api import HasTraits
+
 from enaml.core.dynamicscope import DynamicScope
 from enaml.core.expression_engine import HandlerPair, ReadHandler
 from enaml.core.funchelper import call_func
 from enaml.core.operators import gen_tracer, op_notify, op_simple, op_update
-from enaml.core.standard_handlers import HandlerMixin
+from enaml.core.standard_handlers import (
+    HandlerMixin, StandardInvertedWriteHandler)
 
-from .traits_tracer import TraitsTracer
+from . import stats
+from .traits_tracer import (
+    CoalescingTraitsObserver, ThrottlingTraitsObserver, TraitsObserver,
+    NO_VALUE, TraitsTracer, connect_observe, delegate_guard, traced_names,
+    values_equal)
 
 
 class TraitsTracedReadHandler(ReadHandler, HandlerMixin):
@@ -26,25 +38,243 @@ class TraitsTracedReadHandler(ReadHandler, HandlerMixin):
     This handler is used in conjuction with the standard '<<' operator.
 
     """
+    #: The callable used by the tracer to create the observer of the
+    #: traced dependencies.
+    observer_factory = Callable(TraitsObserver)
+
+    #: Whether to leave the attribute of the owner untouched when a
+    #: change of the dependencies re-evaluates the expression to a
+    #: value equal to the last computed one.
+    skip_equal = Bool(False)
+
     def __call__(self, owner, name):
         """ Evaluate and return the expression value.
 
+        The evaluation is recorded in the binding statistics when they
+        are enabled. See `traits_enaml.stats`.
+
+        """
+        tr = TraitsTracer(owner, name, self.observer_factory)
+        if stats.enabled:
+            start = default_timer()
+            try:
+                value = self.evaluate(owner, tr)
+            finally:
+                stats.record_evaluation(
+                    owner, name, default_timer() - start,
+                    len(tr.traced_traits))
+        else:
+            value = self.evaluate(owner, tr)
+        if self.skip_equal and tr.observer is not None:
+            observer = tr.observer
+            last_value = observer.last_value
+            observer.last_value = value
+            if last_value is not NO_VALUE and values_equal(value, last_value):
+                # the engine assigns the attribute its own value back,
+                # which leaves it untouched
+                return getattr(owner, name)
+        return value
+
+    def evaluate(self, owner, tracer):
+        """ Evaluate the expression with the given tracer.
+
+        Parameters
+        ----------
+        owner : Declarative
+            The declarative object on which the expression executes.
+
+        tracer : TraitsTracer
+            The tracer which subscribes to the traced dependencies.
+
+        Returns
+        -------
+        result : object
+            The value of the expression.
+
+        """
+        func = self.func
+        f_globals = func.__globals__
+        f_builtins = f_globals['__builtins__']
+        f_locals = self.get_locals(owner)
+        scope = DynamicScope(
+            owner, f_locals, f_globals, f_builtins, None, tracer)
+        return call_func(func, (tracer,), {}, scope)
+
+
+class TraitsChainReadHandler(TraitsTracedReadHandler):
+    """ An expression read handler for plain attribute chains.
+
+    This handler is used in conjuction with the '<<' operator for the
+    expressions of the form `obj.a.b.c`. When every attribute of the
+    chain is a trait, the chain is evaluated with plain attribute
+    access and a single extended name listener is subscribed on the
+    root object, without tracing the code execution. Otherwise, the
+    expression is evaluated with the traced code.
+
+    With the `items_events` option, when the chain ends on a collection
+    trait and the owner declares an event named after the bound
+    attribute with an '_items' suffix, e.g. `event values_items` for a
+    binding `values << model.values`, the items events of the collection
+    are fired on that event instead of re-evaluating the expression.
+
+    """
+    #: The name of the root object of the chain.
+    root = Str()
+
+    #: The names of the attributes accessed on the root object.
+    attrs = Tuple()
+
+    #: Whether to fire the items events of the collection at the end of
+    #: the chain on the '_items' event of the owner.
+    items_events = Bool(False)
+
+    def evaluate(self, owner, tracer):
+        """ Evaluate the expression with the given tracer.
+
+        See `TraitsTracedReadHandler.evaluate`.
+
         """
         func = self.func
         f_globals = func.__globals__
         f_builtins = f_globals['__builtins__']
         f_locals = self.get_locals(owner)
-        tr = TraitsTracer(owner, name)
-        scope = DynamicScope(owner, f_locals, f_globals, f_builtins, None, tr)
-        return call_func(func, (tr,), {}, scope)
+        scope = DynamicScope(
+            owner, f_locals, f_globals, f_builtins, None, tracer)
+
+        # the root lookup traces the dynamically scoped atom members
+        try:
+            obj = scope[self.root]
+        except KeyError:
+            obj = None
+
+        if isinstance(obj, HasTraits):
+            attrs = self.attrs
+            value = obj
+            for attr in attrs:
+                if not isinstance(value, HasTraits):
+                    break
+                names = traced_names(value, attr)
+                if not names:
+                    break
+                value = getattr(value, attr)
+            else:
+                prefix = attrs[:-1]
+                for trait_name in names:
+                    extended_name = '.'.join(prefix + (trait_name,))
+                    tracer.traced_traits.add((obj, extended_name))
+                tracer.finalize()
+                if self.items_events:
+                    self.set_items_name(owner, tracer, len(names) > 1)
+                return value
+
+        value = call_func(func, (tracer,), {}, scope)
+        if self.items_events:
+            self.set_items_name(owner, tracer, False)
+        return value
+
+    def set_items_name(self, owner, tracer, collection):
+        """ Set the event of the owner receiving the items events.
+
+        Parameters
+        ----------
+        owner : Declarative
+            The declarative object on which the expression executes.
+
+        tracer : TraitsTracer
+            The tracer of the evaluation.
+
+        collection : bool
+            Whether the chain was evaluated to a collection trait.
+
+        """
+        observer = tracer.observer
+        if observer is None:
+            return
+        items_name = tracer.name + '_items'
+        if collection and isinstance(owner.get_member(items_name), Event):
+            observer.items_name = items_name
+        else:
+            observer.items_name = None
+
+
+class TraitsDelegateWriteHandler(StandardInvertedWriteHandler):
+    """ An expression write handler which suppresses the loopback.
+
+    This handler is used in conjuction with the ':=' operator. The
+    change notifications caused by writing the attribute value back to
+    the traits are dropped by the observer of the paired read handler,
+    so the written value is not re-evaluated and pushed back into the
+    owner, not even later by the observers which defer their updates.
+
+    """
+    def __call__(self, owner, name, change):
+        """ Write the attribute value back to the expression.
+
+        """
+        key = (owner, name)
+        delegate_guard.acquire_item(key)
+        try:
+            super(TraitsDelegateWriteHandler, self).__call__(
+                owner, name, change)
+        finally:
+            delegate_guard.release_item(key)
+        # the attribute no longer holds the last computed value
+        observer = owner._d_storage.get('_[%s|trace]' % name)
+        if isinstance(observer, TraitsObserver):
+            observer.last_value = NO_VALUE
+
+
+#: The opcodes which do not change the evaluated value of a code object,
+#: see `attribute_chain`.
+NEUTRAL_OPCODES = frozenset(['NOP', 'RESUME', 'CACHE', 'EXTENDED_ARG'])
+
+
+def attribute_chain(code):
+    """ Return the attribute chain evaluated by a code object.
+
+    Parameters
+    ----------
+    code : CodeType
+        The code object created by the Enaml compiler.
+
+    Returns
+    -------
+    result : tuple or None
+        The name of the root object and the tuple of the attribute
+        names if the code only evaluates an expression of the form
+        `obj.a.b.c`, None otherwise. None is also returned when the
+        bytecode cannot be inspected (Python 2).
+
+    """
+    get_instructions = getattr(dis, 'get_instructions', None)
+    if get_instructions is None:
+        return None
+    ops = [
+        (ins.opname, ins.argval) for ins in get_instructions(code)
+        if ins.opname not in NEUTRAL_OPCODES]
+    if len(ops) < 3:
+        return None
+    (first_op, root), (last_op, _) = ops[0], ops[-1]
+    if first_op != 'LOAD_NAME' or last_op != 'RETURN_VALUE':
+        return None
+    attrs = []
+    for op, arg in ops[1:-1]:
+        if op != 'LOAD_ATTR':
+            return None
+        attrs.append(arg)
+    return root, tuple(attrs)
 
 
-def trait_op_subscribe(code, scope_key, f_globals):
+def trait_op_subscribe(code, scope_key, f_globals,
+                       observer_factory=TraitsObserver, skip_equal=False,
+                       items_events=False):
     """ The Traits Enaml operator function for the `<<` operator.
 
     This operator generates a tracer function with optimized local
-    access and hooks it up to a TraitsTracedReadHandler. This
-    operator does not support write semantics.
+    access and hooks it up to a TraitsTracedReadHandler. Expressions
+    which are plain attribute chains are hooked up to a
+    TraitsChainReadHandler instead. This operator does not support
+    write semantics.
 
     Parameters
     ----------
@@ -57,6 +287,21 @@ def trait_op_subscribe(code, scope_key, f_globals):
     f_globals : dict
         The global scope for the for code execution.
 
+    observer_factory : callable, optional
+        The factory of the observer which subscribes to the traced
+        dependencies. The default is `TraitsObserver`.
+
+    skip_equal : bool, optional
+        If True, the attribute is not assigned when the expression is
+        re-evaluated to a value equal to the last computed one. The
+        default is False.
+
+    items_events : bool, optional
+        If True, the items events of a collection trait bound with an
+        attribute chain are fired on the '_items' event of the owner,
+        if it declares one, see `TraitsChainReadHandler`. The default
+        is False.
+
     Returns
     -------
     result : HandlerPair
@@ -64,11 +309,23 @@ def trait_op_subscribe(code, scope_key, f_globals):
 
     """
     func = gen_tracer(code, f_globals)
-    reader = TraitsTracedReadHandler(func=func, scope_key=scope_key)
+    chain = attribute_chain(code)
+    if chain is not None:
+        root, attrs = chain
+        reader = TraitsChainReadHandler(
+            func=func, scope_key=scope_key, observer_factory=observer_factory,
+            skip_equal=skip_equal, root=root, attrs=attrs,
+            items_events=items_events)
+    else:
+        reader = TraitsTracedReadHandler(
+            func=func, scope_key=scope_key, observer_factory=observer_factory,
+            skip_equal=skip_equal)
     return HandlerPair(reader=reader)
 
 
-def trait_op_delegate(code, scope_key, f_globals):
+def trait_op_delegate(code, scope_key, f_globals,
+                      observer_factory=TraitsObserver, skip_equal=False,
+                      items_events=False):
     """ The Traits Enaml operator function for the `:=` operator.
 
     This operator combines the '<<' and the '>>' operators into a
@@ -85,16 +342,34 @@ def trait_op_delegate(code, scope_key, f_globals):
     f_globals : dict
         The global scope for the for code execution.
 
+    observer_factory : callable, optional
+        The factory of the observer which subscribes to the traced
+        dependencies. The default is `TraitsObserver`.
+
+    skip_equal : bool, optional
+        If True, the attribute is not assigned when the expression is
+        re-evaluated to a value equal to the last computed one. The
+        default is False.
+
+    items_events : bool, optional
+        If True, the items events of a collection trait bound with an
+        attribute chain are fired on the '_items' event of the owner,
+        if it declares one. The default is False.
+
     Returns
     -------
     result : HandlerPair
         A pair with the reader set to a TraitsTracedReadHandler and
-        the writer set to a StandardInvertedWriteHandler.
+        the writer set to a TraitsDelegateWriteHandler.
 
     """
-    p1 = trait_op_subscribe(code, scope_key, f_globals)
+    p1 = trait_op_subscribe(
+        code, scope_key, f_globals, observer_factory, skip_equal,
+        items_events)
     p2 = op_update(code, scope_key, f_globals)
-    return HandlerPair(reader=p1.reader, writer=p2.writer)
+    writer = TraitsDelegateWriteHandler(
+        func=p2.writer.func, scope_key=scope_key)
+    return HandlerPair(reader=p1.reader, writer=writer)
 
 
 TRAIT_OPERATORS = {
@@ -104,3 +379,80 @@ TRAIT_OPERATORS = {
     '<<': trait_op_subscribe,
     ':=': trait_op_delegate,
 }
+
+
+def make_trait_operators(coalesce=False, observe=False, throttle=None,
+                         dispatch='same', skip_equal=False,
+                         items_events=False):
+    """ Create a dictionary of Traits Enaml operators.
+
+    Parameters
+    ----------
+    coalesce : bool, optional
+        If True, the '<<' and ':=' expressions are re-evaluated at most
+        once per event loop iteration, no matter how many of their
+        dependencies changed in the meantime. The default is False.
+
+    observe : bool, optional
+        If True, the '<<' and ':=' expressions subscribe to the traits
+        with the `observe` framework instead of `on_trait_change`. The
+        default is False.
+
+    throttle : int, optional
+        If given, the '<<' and ':=' expressions are re-evaluated at most
+        once per `throttle` milliseconds. The last change is always
+        delivered. This cannot be combined with `coalesce`.
+
+    dispatch : {'same', 'ui'}, optional
+        With 'ui', the change notifications of the '<<' and ':='
+        expressions which happen on a worker thread are queued to the
+        GUI thread, and repeated notifications are collapsed. The
+        default, 'same', handles them on the thread of the change.
+
+    skip_equal : bool, optional
+        If True, the attributes bound with '<<' and ':=' are not
+        assigned when a change of the dependencies re-evaluates the
+        expression to a value equal to the last computed one. The
+        default is False.
+
+    items_events : bool, optional
+        If True, a '<<' or ':=' binding of an attribute chain which
+        evaluates to a List, Dict or Set trait fires the items events
+        of the collection on the '_items' event of the owner, if it
+        declares one, instead of re-evaluating the expression. The
+        default is False.
+
+    Returns
+    -------
+    result : dict
+        A dictionary of operators to use with `enaml.imports`.
+
+    """
+    if coalesce and throttle is not None:
+        raise ValueError('The coalesce and throttle options are exclusive.')
+    if not (coalesce or observe or throttle is not None or
+            dispatch != 'same' or skip_equal or items_events):
+        return dict(TRAIT_OPERATORS)
+
+    kwargs = {}
+    if coalesce:
+        observer_type = CoalescingTraitsObserver
+    elif throttle is not None:
+        observer_type = ThrottlingTraitsObserver
+        kwargs['interval'] = throttle
+    else:
+        observer_type = TraitsObserver
+    if observe:
+        kwargs['connect'] = connect_observe
+    if dispatch != 'same':
+        kwargs['dispatch'] = dispatch
+    observer_factory = partial(observer_type, **kwargs)
+
+    operators = dict(TRAIT_OPERATORS)
+    operators['<<'] = partial(
+        trait_op_subscribe, observer_factory=observer_factory,
+        skip_equal=skip_equal, items_events=items_events)
+    operators[':='] = partial(
+        trait_op_delegate, observer_factory=observer_factory,
+        skip_equal=skip_equal, items_events=items_events)
+    return operators
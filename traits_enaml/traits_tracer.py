@@ -11,20 +11,555 @@
 #  Thanks for using Enthought open source!
 #
 #----------------------------------------------------------------------------
+from collections import OrderedDict
+from math import ceil
+from timeit import default_timer
+from weakref import WeakKeyDictionary
+
+try:
+    from collections.abc import Hashable
+except ImportError:  # Python 2
+    from collections import Hashable
+
+try:
+    from threading import main_thread
+except ImportError:  # Python 2
+    from threading import _shutdown
+
+    def main_thread():
+        """ Return the main thread, like Python 3's threading.main_thread.
+
+        """
+        return _shutdown.__self__
+
 import six
+from six.moves._thread import get_ident
 
-from traits.api import HasTraits, Disallow, TraitListObject, TraitDictObject
+from traits.api import (
+    HasTraits, Disallow, TraitDictEvent, TraitListEvent, TraitListObject,
+    TraitDictObject, TraitSetEvent)
 
+from enaml.application import deferred_call, timed_call
 from enaml.core.standard_tracer import StandardTracer, SubscriptionObserver
 
+from . import stats
+from .utils import ThreadLocalLoopbackGuard
+
+try:
+    from traits.observation.api import observe, trait
+except ImportError:  # traits < 6.1
+    observe = trait = None
+
+
+#: The guard of the (owner, name) bindings which are writing the value
+#: of their attribute back to the traits, see `TraitsObserver.__call__`.
+#: Only the notifications raised by the write on its own thread are
+#: loopbacks, a change made at the same time by a worker thread is not.
+delegate_guard = ThreadLocalLoopbackGuard()
+
+#: The last value of an observer which does not compare the values of
+#: its expression, see `TraitsTracedReadHandler.skip_equal`.
+NO_VALUE = object()
+
+#: The types of the events fired for the changes of the items of a
+#: collection trait.
+ITEMS_EVENTS = (TraitListEvent, TraitDictEvent, TraitSetEvent)
+
+#: A cache of the trait names to trace for an attribute of a HasTraits
+#: object. The classes are held weakly and map the attribute names to
+#: the (class trait, names) pairs. See `traced_names`.
+_traced_names_cache = WeakKeyDictionary()
+
+
+def traced_names(obj, name):
+    """ Return the names of the traits to trace for an object attribute.
+
+    The result is cached on the class of the object and the name of the
+    attribute, and is recomputed when the class trait of the attribute
+    is replaced, e.g. by `add_class_trait`. The cache is bypassed for
+    objects which override the class trait with an instance trait
+    through `add_trait`.
+
+    Parameters
+    ----------
+    obj : HasTraits
+        The traits object owning the attribute.
+
+    name : str
+        The name of the attribute.
+
+    Returns
+    -------
+    result : tuple
+        The trait names to trace. This is empty if the attribute is
+        not a trait, or holds the name of the trait followed by the
+        name of the items trait when the trait is a collection.
+
+    """
+    cls = type(obj)
+    ctrait = cls.__class_traits__.get(name)
+    itrait = obj._instance_traits().get(name)
+    if itrait is not None and (
+            ctrait is None or itrait.handler is not ctrait.handler):
+        # an instance trait added by `add_trait` only holds for obj
+        return _trait_names(obj, name)
+
+    class_cache = _traced_names_cache.get(cls)
+    if class_cache is None:
+        class_cache = _traced_names_cache[cls] = {}
+    cached = class_cache.get(name)
+    if cached is not None and cached[0] is ctrait:
+        return cached[1]
+    names = _trait_names(obj, name)
+    # looking up a prefix trait may have added it to the class traits
+    class_cache[name] = (cls.__class_traits__.get(name), names)
+    return names
+
+
+def _trait_names(obj, name):
+    """ Compute the names of the traits to trace, see `traced_names`.
+
+    """
+    # Traits will happily force create a trait for things which aren't
+    # actually traits. This tries to avoid most of that when possible.
+    trait = obj.trait(name)
+    if trait is None or trait.trait_type is Disallow:
+        return ()
+    handler = trait.handler
+    if handler is not None and handler.has_items:
+        return (name, '{}_items'.format(name))
+    return (name,)
+
+
+def connect_on_trait_change(obj, name, handler, remove=False):
+    """ Hook up a handler to a trait with `on_trait_change`.
+
+    Parameters
+    ----------
+    obj : HasTraits
+        The traits object owning the trait.
+
+    name : str
+        The name of the trait. This can be an extended name.
+
+    handler : callable
+        The handler to invoke when the trait changes.
+
+    remove : bool, optional
+        Whether to remove the handler instead of adding it.
+
+    """
+    obj.on_trait_change(handler, name, remove=remove)
+
+
+#: The maximum number of observer expressions cached by
+#: `shared_observer_expression`.
+OBSERVER_EXPRESSIONS_CACHE_SIZE = 256
+
+#: The least recently used cache of the observer expressions, keyed on
+#: the trait name. The most recently used expression comes last.
+_observer_expressions = OrderedDict()
+
+
+def shared_observer_expression(name):
+    """ Return the observer expression of a trait name.
+
+    The expressions of the most recently subscribed names are cached,
+    so that the subscriptions to the same trait name share them.
+
+    Parameters
+    ----------
+    name : str
+        The name of the trait. Extended names of the form 'a.b.c' are
+        converted to a chain of optional traits.
+
+    Returns
+    -------
+    result : ObserverExpression
+        The expression to use with `observe`.
+
+    """
+    expression = _observer_expressions.pop(name, None)
+    if expression is None:
+        if trait is None:
+            raise RuntimeError(
+                'Subscribing with observe requires traits 6.1 or newer.')
+        names = name.split('.')
+        expression = trait(names[0], optional=True)
+        for link in names[1:]:
+            expression = expression.trait(link, optional=True)
+        if len(_observer_expressions) >= OBSERVER_EXPRESSIONS_CACHE_SIZE:
+            _observer_expressions.popitem(last=False)
+    _observer_expressions[name] = expression
+    return expression
+
+
+def connect_observe(obj, name, handler, remove=False):
+    """ Hook up a handler to a trait with the `observe` framework.
+
+    The observer expressions are shared between the subscriptions to
+    the same trait name. See `connect_on_trait_change` for the
+    parameters.
+
+    """
+    observe(obj, shared_observer_expression(name), handler, remove=remove)
+
 
 class TraitsObserver(SubscriptionObserver):
     """ An observer object which manages a tracer subscription.
 
-    Subclassed to allow weak-referencing.
+    Subclassed to allow weak-referencing and to keep track of the
+    dependencies to which the observer is currently subscribed, so
+    that a re-evaluated expression only needs to update the handlers
+    of the dependencies which have changed.
+
+    When `items_name` is set, the items events of the traced collection
+    trait (`TraitListEvent`, `TraitDictEvent` and `TraitSetEvent`) are
+    fired on that event of the owner instead of re-evaluating the
+    expression. This lets the owner apply incremental updates. It is
+    set by `TraitsChainReadHandler` with the `items_events` option, for
+    the expressions which evaluate to the collection itself.
 
     """
-    __slots__ = ('__weakref__',)
+    __slots__ = (
+        '__weakref__', 'items', 'traced_traits', 'connect', 'thread_id',
+        'queued', 'items_name', 'last_value')
+
+    #: Whether `notify` defers the update of the expression. Otherwise,
+    #: `__call__` updates the expression without calling `notify`.
+    deferred = False
+
+    def __init__(self, owner, name, connect=connect_on_trait_change,
+                 dispatch='same'):
+        """ Initialize a TraitsObserver.
+
+        Parameters
+        ----------
+        owner : Declarative
+            The declarative owner of interest.
+
+        name : string
+            The name to which the operator is bound.
+
+        connect : callable, optional
+            The function used to hook up the observer to the traits,
+            either `connect_on_trait_change` (the default) or
+            `connect_observe`.
+
+        dispatch : {'same', 'ui'}, optional
+            With 'same' (the default), the notifications are handled on
+            the thread where the change occurs. With 'ui', the
+            notifications received on another thread than the main
+            thread, which runs the GUI event loop, are queued to the
+            GUI thread, and repeated notifications are collapsed until
+            the queued one is handled.
+
+        """
+        super(TraitsObserver, self).__init__(owner, name)
+        self.items = frozenset()
+        self.traced_traits = frozenset()
+        self.connect = connect
+        if dispatch == 'ui':
+            self.thread_id = main_thread().ident
+        elif dispatch == 'same':
+            self.thread_id = None
+        else:
+            raise ValueError('Unknown dispatch: {!r}'.format(dispatch))
+        self.queued = False
+        self.items_name = None
+        self.last_value = NO_VALUE
+
+    def subscribe(self, items, traced_traits):
+        """ Update the subscriptions of the observer.
+
+        Only the difference between the current and the new
+        dependencies is hooked up or removed, the handlers of the
+        dependencies which are common to both are left untouched.
+
+        Parameters
+        ----------
+        items : set
+            The (obj, name) pairs of the atom items to observe.
+
+        traced_traits : set
+            The (obj, name) pairs of the traits items to observe.
+
+        """
+        old_items = self.items
+        for obj, d_name in old_items - items:
+            obj.unobserve(d_name, self)
+        for obj, d_name in items - old_items:
+            obj.observe(d_name, self)
+        self.items = frozenset(items)
+
+        old_traits = self.traced_traits
+        connect = self.connect
+        handler = self.__call__
+        for obj, d_name in old_traits - traced_traits:
+            connect(obj, d_name, handler, remove=True)
+        for obj, d_name in traced_traits - old_traits:
+            connect(obj, d_name, handler)
+        self.traced_traits = frozenset(traced_traits)
+
+    def unsubscribe(self):
+        """ Remove all the subscriptions of the observer.
+
+        """
+        self.subscribe(frozenset(), frozenset())
+
+    def __call__(self, change):
+        """ The handler for the change notification.
+
+        This will be invoked by the Atom and Traits observer mechanisms
+        when an item which is being observed changes.
+
+        The notifications caused by the binding writing its own value
+        back to the traits (with the ':=' operator) are dropped.
+
+        """
+        if delegate_guard.locked_items is not None and self.ref:
+            if (self.ref(), self.name) in delegate_guard:
+                return
+        thread_id = self.thread_id
+        if self.items_name is not None:
+            if self.connect is connect_observe:
+                event = getattr(change, 'new', change)
+            else:
+                event = change
+            if isinstance(event, ITEMS_EVENTS):
+                if thread_id is not None and get_ident() != thread_id:
+                    deferred_call(self.deliver_items, event)
+                else:
+                    self.deliver_items(event)
+                return
+        if thread_id is not None and get_ident() != thread_id:
+            if not self.queued:
+                self.queued = True
+                deferred_call(self.dispatch_queued)
+            return
+        if stats.enabled:
+            if self.ref:
+                stats.record_notification(self.ref(), self.name)
+            self.notify()
+        elif self.deferred:
+            self.notify()
+        elif self.ref:
+            # the update is inlined on the hot path, see `update`
+            owner = self.ref()
+            engine = owner._d_engine
+            if engine is not None:
+                engine.update(owner, self.name)
+
+    def deliver_items(self, event):
+        """ Fire an items event of a traced collection on the owner.
+
+        Items events are delivered right away and one by one, the
+        dispatch policies of the subclasses do not apply to them.
+
+        Parameters
+        ----------
+        event : TraitListEvent, TraitDictEvent or TraitSetEvent
+            The event describing the change of the collection items.
+
+        """
+        owner = self.ref()
+        if owner is not None:
+            if stats.enabled:
+                stats.record_notification(owner, self.name)
+            setattr(owner, self.items_name, event)
+
+    def dispatch_queued(self):
+        """ Handle on the GUI thread a notification from another thread.
+
+        """
+        self.queued = False
+        self(None)
+
+    def notify(self):
+        """ Handle a change of the observed dependencies.
+
+        The default implementation updates the expression right away.
+        Subclasses reimplement this method to defer the update, and
+        set `deferred` to True.
+
+        """
+        self.update()
+
+    def update(self):
+        """ Update the expression of the owner.
+
+        """
+        if self.ref:
+            owner = self.ref()
+            engine = owner._d_engine
+            if engine is not None:
+                engine.update(owner, self.name)
+
+
+def values_equal(value, other):
+    """ Return whether two values of an expression are equal.
+
+    An unhashable object compared with itself is deemed to be changed,
+    since it may have been modified in place. The values which cannot
+    be compared are deemed to differ.
+
+    """
+    if value is other:
+        return isinstance(value, Hashable)
+    try:
+        return bool(value == other)
+    except Exception:
+        return False
+
+
+class CoalescingTraitsObserver(TraitsObserver):
+    """ A TraitsObserver which coalesces the change notifications.
+
+    Instead of updating the expression on every notification, the
+    observer is marked as dirty and the update is deferred to the
+    next iteration of the event loop. An expression is thus
+    re-evaluated at most once per event loop iteration, no matter how
+    many of its dependencies have changed in the meantime.
+
+    """
+    __slots__ = ('pending',)
+
+    deferred = True
+
+    def __init__(self, owner, name, **kwargs):
+        """ Initialize a CoalescingTraitsObserver.
+
+        See `TraitsObserver` for the parameters.
+
+        """
+        super(CoalescingTraitsObserver, self).__init__(owner, name, **kwargs)
+        self.pending = False
+
+    def notify(self):
+        """ Schedule a deferred update of the expression.
+
+        Nothing is scheduled if an update is already pending.
+
+        """
+        if self.ref and not self.pending:
+            self.pending = True
+            deferred_call(self.flush)
+
+    def flush(self):
+        """ Update the expression if an update is pending.
+
+        """
+        if self.pending:
+            self.pending = False
+            self.update()
+
+
+class ThrottlingTraitsObserver(TraitsObserver):
+    """ A TraitsObserver which throttles the updates of the expression.
+
+    The expression is updated at most once per `interval` milliseconds.
+    A notification received less than `interval` milliseconds after
+    the last update schedules an update with a timer, which evaluates
+    the expression with the latest values of its dependencies. The
+    last change is thus always delivered.
+
+    """
+    __slots__ = ('interval', 'pending', 'last_update')
+
+    deferred = True
+
+    def __init__(self, owner, name, interval, **kwargs):
+        """ Initialize a ThrottlingTraitsObserver.
+
+        Parameters
+        ----------
+        interval : int
+            The minimum delay, in milliseconds, between two updates of
+            the expression.
+
+        See `TraitsObserver` for the other parameters.
+
+        """
+        super(ThrottlingTraitsObserver, self).__init__(owner, name, **kwargs)
+        self.interval = interval
+        self.pending = False
+        self.last_update = None
+
+    def notify(self):
+        """ Update the expression now or schedule a delayed update.
+
+        Nothing is scheduled if an update is already pending.
+
+        """
+        if not self.ref or self.pending:
+            return
+        last_update = self.last_update
+        if last_update is not None:
+            elapsed = (default_timer() - last_update) * 1000.0
+            if elapsed < self.interval:
+                self.pending = True
+                timed_call(int(ceil(self.interval - elapsed)), self.flush)
+                return
+        self.last_update = default_timer()
+        self.update()
+
+    def flush(self):
+        """ Update the expression if an update is pending.
+
+        """
+        if self.pending:
+            self.pending = False
+            self.last_update = default_timer()
+            self.update()
+
+
+class TraitsTeardown(object):
+    """ A handler which unsubscribes the observers of a declarative.
+
+    An instance is attached to the `destroyed` event of every
+    declarative object which owns TraitsObservers. When the object is
+    destroyed, the handlers of the observers are removed right away
+    from the traits objects, instead of relying on the collection of
+    the observers.
+
+    """
+    __slots__ = ('observers',)
+
+    def __init__(self):
+        """ Initialize a TraitsTeardown.
+
+        """
+        self.observers = []
+
+    @classmethod
+    def register(cls, owner, observer):
+        """ Register an observer to unsubscribe when its owner dies.
+
+        Parameters
+        ----------
+        owner : Declarative
+            The declarative owner of the observer.
+
+        observer : TraitsObserver
+            The observer to unsubscribe when the owner is destroyed.
+
+        """
+        key = '_[traits|teardown]'
+        storage = owner._d_storage
+        teardown = storage.get(key)
+        if teardown is None:
+            teardown = storage[key] = cls()
+            owner.observe('destroyed', teardown)
+        teardown.observers.append(observer)
+
+    def __call__(self, change):
+        """ The handler for the `destroyed` event of the owner.
+
+        """
+        observers, self.observers = self.observers, []
+        for observer in observers:
+            observer.unsubscribe()
+            observer.ref = None
 
 
 class TraitsTracer(StandardTracer):
@@ -34,14 +569,29 @@ class TraitsTracer(StandardTracer):
     (obj, name) pairs of traits items discovered during tracing.
 
     """
-    __slots__ = 'traced_traits'
+    __slots__ = ('traced_traits', 'observer_factory', 'observer')
 
-    def __init__(self, owner, name):
+    def __init__(self, owner, name, observer_factory=TraitsObserver):
         """ Initialize a TraitsTracer.
 
+        Parameters
+        ----------
+        owner : Declarative
+            The declarative owner of the traced expression.
+
+        name : string
+            The name to which the operator is bound.
+
+        observer_factory : callable, optional
+            A callable which takes the owner and the name and returns
+            the TraitsObserver to subscribe to the traced dependencies.
+            The default is `TraitsObserver`.
+
         """
         super(TraitsTracer, self).__init__(owner, name)
         self.traced_traits = set()
+        self.observer_factory = observer_factory
+        self.observer = None
 
     #--------------------------------------------------------------------------
     # Private API
@@ -58,14 +608,9 @@ class TraitsTracer(StandardTracer):
             The trait name to for which to bind a handler.
 
         """
-        # Traits will happily force create a trait for things which aren't
-        # actually traits. This tries to avoid most of that when possible.
-        trait = obj.trait(name)
-        if trait is not None and trait.trait_type is not Disallow:
-            self.traced_traits.add((obj, name))
-            # Check for collections.
-            if trait.handler is not None and trait.handler.has_items:
-                self.traced_traits.add((obj, '{}_items'.format(name)))
+        traced_traits = self.traced_traits
+        for trait_name in traced_names(obj, name):
+            traced_traits.add((obj, trait_name))
 
     #--------------------------------------------------------------------------
     # AbstractScopeListener Interface
@@ -144,8 +689,9 @@ class TraitsTracer(StandardTracer):
     def finalize(self):
         """ Finalize the tracing process.
 
-        This method will discard the old observer and attach a new
-        observer to the traced dependencies.
+        This method will reuse the observer of the previous evaluation
+        (if any) and update its subscriptions to match the traced
+        dependencies.
 
         """
         owner = self.owner
@@ -153,16 +699,17 @@ class TraitsTracer(StandardTracer):
         key = '_[%s|trace]' % name
         storage = owner._d_storage
 
-        # invalidate the old observer so that it can be collected
-        old_observer = storage.get(key)
-        if old_observer is not None:
-            old_observer.ref = None
-
-        # create a new observer and subscribe it to the dependencies
-        if self.items or self.traced_traits:
-            observer = TraitsObserver(owner, name)
+        observer = storage.get(key)
+        if not isinstance(observer, TraitsObserver):
+            # invalidate a foreign observer so that it can be collected
+            if observer is not None:
+                observer.ref = None
+            if not (self.items or self.traced_traits):
+                return
+            observer = self.observer_factory(owner, name)
             storage[key] = observer
-            for obj, d_name in self.items:
-                obj.observe(d_name, observer)
-            for obj, d_name in self.traced_traits:
-                obj.on_trait_change(observer.__call__, d_name)
+            TraitsTeardown.register(owner, observer)
+
+        # only hook up or remove the dependencies which have changed
+        observer.subscribe(self.items, self.traced_traits)
+        self.observer = observer
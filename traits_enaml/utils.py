@@ -14,7 +14,7 @@
 """ An amalgamation of utilities used throughout the Traits Enaml framework.
 
 """
-from collections import defaultdict
+from threading import local
 
 
 class abstractclassmethod(classmethod):
@@ -32,7 +32,8 @@ class LoopbackContext(object):
     """ A context manager generated by LoopbackGuard.
 
     Instances of this class manage acquiring and releasing the lock
-    items for instances of LoopbackGuard.
+    items for instances of LoopbackGuard. A context can be created once
+    and reused, also in nested `with` statements.
 
     """
     __slots__ = ('_guard', '_items')
@@ -67,6 +68,48 @@ class LoopbackContext(object):
         self._guard.release(self._items)
 
 
+class LoopbackItemContext(object):
+    """ A context manager generated by LoopbackGuard for a single item.
+
+    This is the counterpart of LoopbackContext for the common case of
+    a single lock item: entering and exiting the context neither builds
+    a tuple nor iterates over the items. A context can be created once
+    and reused for every guarded update, also in nested `with`
+    statements.
+
+    """
+    __slots__ = ('_guard', '_item')
+
+    def __init__(self, guard, item):
+        """ Initialize a LoopbackItemContext
+
+        Parameters
+        ----------
+        guard : LoopbackGuard
+            The loopback guard instance for which we will acquire the
+            lock for the item.
+
+        item : object
+            The item which will be passed to the 'acquire_item' method
+            on the loopback guard.
+
+        """
+        self._guard = guard
+        self._item = item
+
+    def __enter__(self):
+        """ Acquire the guard lock on the lock item.
+
+        """
+        self._guard.acquire_item(self._item)
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """ Release the guard lock on the lock item.
+
+        """
+        self._guard.release_item(self._item)
+
+
 class LoopbackGuard(object):
     """ A guard object to protect against feedback loops.
 
@@ -76,14 +119,19 @@ class LoopbackGuard(object):
     provided lock items. The guard can be tested for a locked item
     using the `in` keyword.
 
+    The `locked_items` dictionary of the acquired counts is None when
+    no item is locked. The same dictionary is reused every time the
+    guard is locked again.
+
     """
-    __slots__ = ('locked_items',)
+    __slots__ = ('locked_items', '_counts')
 
     def __init__(self):
         """ Initialize a loopback guard.
 
         """
         self.locked_items = None
+        self._counts = {}
 
     def __call__(self, *items):
         """ Return a context manager which will guard the given items.
@@ -96,11 +144,13 @@ class LoopbackGuard(object):
 
         Returns
         -------
-        result : LoopbackContext
+        result : LoopbackContext or LoopbackItemContext
             A context manager which will acquire the guard for the
             provided items.
 
         """
+        if len(items) == 1:
+            return LoopbackItemContext(self, items[0])
         return LoopbackContext(self, items)
 
     def __contains__(self, item):
@@ -139,11 +189,26 @@ class LoopbackGuard(object):
             items must be hashable.
 
         """
-        locked_items = self.locked_items
-        if locked_items is None:
-            locked_items = self.locked_items = defaultdict(int)
+        counts = self._counts
         for item in items:
-            locked_items[item] += 1
+            counts[item] = counts.get(item, 0) + 1
+        if counts:
+            self.locked_items = counts
+
+    def acquire_item(self, item):
+        """ Acquire the guard for a single item.
+
+        This is the same as `acquire((item,))`, without the iteration.
+
+        Parameters
+        ----------
+        item : object
+            The hashable object for which to acquire the guard.
+
+        """
+        counts = self._counts
+        counts[item] = counts.get(item, 0) + 1
+        self.locked_items = counts
 
     def release(self, items):
         """ Release the guard for the given lock items.
@@ -162,11 +227,139 @@ class LoopbackGuard(object):
             items must be hashable.
 
         """
-        locked_items = self.locked_items
-        if locked_items is not None:
+        counts = self.locked_items
+        if counts is not None:
             for item in items:
-                locked_items[item] -= 1
-                if locked_items[item] <= 0:
-                    del locked_items[item]
-            if not locked_items:
+                count = counts.get(item, 0) - 1
+                if count > 0:
+                    counts[item] = count
+                else:
+                    counts.pop(item, None)
+            if not counts:
                 self.locked_items = None
+
+    def release_item(self, item):
+        """ Release the guard for a single item.
+
+        This is the same as `release((item,))`, without the iteration.
+
+        Parameters
+        ----------
+        item : object
+            The hashable object for which to release the guard.
+
+        """
+        counts = self.locked_items
+        if counts is not None:
+            count = counts.get(item, 0) - 1
+            if count > 0:
+                counts[item] = count
+            else:
+                counts.pop(item, None)
+                if not counts:
+                    self.locked_items = None
+
+
+class _LoopbackState(local):
+    """ The per thread state of a ThreadLocalLoopbackGuard.
+
+    """
+    def __init__(self):
+        self.locked_items = None
+        self.counts = {}
+
+
+class ThreadLocalLoopbackGuard(LoopbackGuard):
+    """ A LoopbackGuard whose locked items are local to each thread.
+
+    The guard has the same API as LoopbackGuard, but the items acquired
+    on a thread are only guarded on that thread. The guard can thus be
+    shared by updates running at the same time on worker threads and on
+    the GUI thread, without any lock.
+
+    """
+    __slots__ = ('_state',)
+
+    def __init__(self):
+        """ Initialize a thread local loopback guard.
+
+        """
+        self._state = _LoopbackState()
+
+    @property
+    def locked_items(self):
+        """ The dictionary of the acquired counts of the current thread,
+        or None when no item is locked on the current thread.
+
+        """
+        return self._state.locked_items
+
+    def __contains__(self, item):
+        """ Returns whether the item is guarded on the current thread.
+
+        See `LoopbackGuard.__contains__`.
+
+        """
+        locked_items = self._state.locked_items
+        if locked_items is not None:
+            return item in locked_items
+        return False
+
+    def acquire(self, items):
+        """ Acquire the guard for the given items on the current thread.
+
+        See `LoopbackGuard.acquire`.
+
+        """
+        state = self._state
+        counts = state.counts
+        for item in items:
+            counts[item] = counts.get(item, 0) + 1
+        if counts:
+            state.locked_items = counts
+
+    def acquire_item(self, item):
+        """ Acquire the guard for a single item on the current thread.
+
+        See `LoopbackGuard.acquire_item`.
+
+        """
+        state = self._state
+        counts = state.counts
+        counts[item] = counts.get(item, 0) + 1
+        state.locked_items = counts
+
+    def release(self, items):
+        """ Release the guard for the given items on the current thread.
+
+        See `LoopbackGuard.release`.
+
+        """
+        state = self._state
+        counts = state.locked_items
+        if counts is not None:
+            for item in items:
+                count = counts.get(item, 0) - 1
+                if count > 0:
+                    counts[item] = count
+                else:
+                    counts.pop(item, None)
+            if not counts:
+                state.locked_items = None
+
+    def release_item(self, item):
+        """ Release the guard for a single item on the current thread.
+
+        See `LoopbackGuard.release_item`.
+
+        """
+        state = self._state
+        counts = state.locked_items
+        if counts is not None:
+            count = counts.get(item, 0) - 1
+            if count > 0:
+                counts[item] = count
+            else:
+                counts.pop(item, None)
+                if not counts:
+                    state.locked_items = None
@@ -8,24 +8,167 @@
 
 from collections import namedtuple
 from datetime import date, time
+from itertools import count
 from string import capwords
+from timeit import default_timer
 
-from traits.api import (BaseInstance, Bool, Button, Enum, Event, Float, Int,
-                        Range, Str)
+import six
+from traits.api import (Any, BaseBool, BaseFloat, BaseInstance, BaseInt,
+                        BaseStr, Bool, Button, Directory, Enum, Event, File,
+                        Float, HasTraits, Int, List, Range, Str, Tuple)
+from traits.trait_handlers import TraitCoerceType
+from enaml.application import deferred_call
+from enaml.core.api import Include
 import traits_enaml
+from traits_enaml.widgets.editor_placeholder import EditorPlaceholder
 
 with traits_enaml.imports():
     from enaml.widgets.api import Label
     from traits_enaml.widgets.auto_editors import (
-        AutoView, AutoWindow, BoolEditor, ButtonEditor,
-        DateEditor, EnumEditor, FloatEditor, FloatRangeEditor,
+        AutoScrollView, AutoTable, AutoView, AutoWindow, BoolEditor,
+        ButtonEditor, DateEditor, EnumEditor, FloatEditor, FloatRangeEditor,
         IntEditor, IntRangeEditor, StrEditor, TimeEditor,
-        DefaultEditor)
+        DefaultEditor, VirtualAutoView, ArrayEditor, ColorEditor,
+        DirectoryEditor, FallbackEditor, FileEditor, InstanceEditor,
+        ListEditor, TraitsUIColorEditor, TupleEditor)
+
+try:
+    from traits.api import Array
+except ImportError:  # numpy is not available
+    Array = None
+
+try:
+    from pyface.ui_traits import PyfaceColor
+except ImportError:  # pyface < 7.2
+    PyfaceColor = None
 
 TraitDesc = namedtuple('TraitDesc', 'name trait_type label tooltip editor')
 
+
+# The time in seconds spent creating editors before the progressive
+# construction of a view yields to the event loop.
+PROGRESSIVE_TIME_SLICE = 0.02
+
+# Dictionary from trait_type -> list of (priority, serial, factory)
+# registrations, sorted by priority and registration order.
+_editor_registry = {}
+
+# Counter ordering the registrations of the same priority.
+_registration_counter = count()
+
+# Cache from trait type class -> enaml component factory.
+_factory_cache = {}
+
+# Cache from HasTraits class -> list of (TraitDesc, editor) pairs.
+_class_editors_cache = {}
+
+
+def _clear_caches():
+    _factory_cache.clear()
+    _class_editors_cache.clear()
+
+
+def register_editor(trait_type, factory, priority=0):
+    """ Register an enaml editor factory for a trait type.
+
+    The editor of a trait is resolved through the MRO of its trait type
+    class: the registrations of the most derived class are used, and
+    among them the one with the highest priority wins. Registrations
+    with the same priority are resolved in favour of the latest one.
+
+    Parameters
+    ----------
+    trait_type : type
+        The TraitType subclass handled by the factory.
+
+    factory : callable
+        A callable which takes the trait type instance and returns the
+        enaml editor component to use, e.g. an enamldef.
+
+    priority : int, optional
+        The priority of the registration. The default is 0, the
+        priority of the builtin editors.
+
+    """
+    registrations = _editor_registry.setdefault(trait_type, [])
+    registrations.append((priority, next(_registration_counter), factory))
+    registrations.sort(key=lambda registration: registration[:2])
+    _clear_caches()
+
+
+def unregister_editor(trait_type, factory):
+    """ Remove the registrations of an editor factory for a trait type.
+
+    Parameters
+    ----------
+    trait_type : type
+        The TraitType subclass handled by the factory.
+
+    factory : callable
+        The factory given to `register_editor`.
+
+    """
+    registrations = [
+        registration for registration in _editor_registry.get(trait_type, [])
+        if registration[2] is not factory]
+    if registrations:
+        _editor_registry[trait_type] = registrations
+    else:
+        _editor_registry.pop(trait_type, None)
+    _clear_caches()
+
+
+class EditorFactories(dict):
+    """ A dictionary from trait_type -> enaml component factories.
+
+    This dictionary is kept for backwards compatibility, setting or
+    deleting an item registers or unregisters the factory with the
+    default priority. See `register_editor`.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(EditorFactories, self).__init__()
+        self.update(*args, **kwargs)
+
+    def __setitem__(self, key, value):
+        if key in self:
+            unregister_editor(key, self[key])
+        super(EditorFactories, self).__setitem__(key, value)
+        register_editor(key, value)
+
+    def __delitem__(self, key):
+        unregister_editor(key, self[key])
+        super(EditorFactories, self).__delitem__(key)
+
+    def clear(self):
+        for key in list(self):
+            del self[key]
+
+    def pop(self, key, *default):
+        if key not in self and default:
+            return default[0]
+        value = self[key]
+        del self[key]
+        return value
+
+    def popitem(self):
+        if not self:
+            raise KeyError('popitem(): dictionary is empty')
+        key = next(iter(self))
+        return key, self.pop(key)
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+
 # Dictionary from trait_type -> enaml component factories.
-TRAIT2ENAML = {
+TRAIT2ENAML = EditorFactories({
     Bool: lambda trait_type: BoolEditor,
     Button: lambda trait_type: ButtonEditor,
     Enum: lambda trait_type: EnumEditor,
@@ -33,41 +176,203 @@ TRAIT2ENAML = {
     Int: lambda trait_type: IntEditor,
     Str: lambda trait_type: StrEditor,
     Range: lambda trait_type: _range_editor_factory(trait_type),
-    BaseInstance: lambda trait_type: _time_editor_factory(trait_type)}
+    BaseInstance: lambda trait_type: _instance_editor_factory(trait_type),
+    List: lambda trait_type: _list_editor_factory(trait_type),
+    Tuple: lambda trait_type: _tuple_editor_factory(trait_type),
+    File: lambda trait_type: FileEditor,
+    Directory: lambda trait_type: DirectoryEditor})
+
+if Array is not None:
+    TRAIT2ENAML[Array] = lambda trait_type: ArrayEditor
 
+if PyfaceColor is not None:
+    TRAIT2ENAML[PyfaceColor] = lambda trait_type: ColorEditor
 
-def auto_view(model):
+# The trait types whose values are edited as Python literals.
+LITERAL_TRAIT_TYPES = (Any, BaseBool, BaseFloat, BaseInt, BaseStr, Enum)
+
+# The Python types of the values of the coerced traits, e.g. the items
+# of Tuple(1, 'a'), which are edited as Python literals.
+LITERAL_TYPES = (bool, float, int, complex) + six.string_types
+
+
+def auto_view(model, lazy=False, virtual=False, progressive=False):
     """ Generate a view directly from a `HasTraits` instance.
+
+    With `lazy` set to True, each editor is represented by a lightweight
+    placeholder and only created when it is first displayed.
+
+    With `virtual` set to True, the traits are displayed in the rows of
+    a Qt item view, the editors are created by a delegate only for the
+    cell being edited and the `enaml_editor` metadata is ignored.
+
+    With `progressive` set to True, the view is returned empty and the
+    labels and editors are appended from the event loop in chunks of
+    `PROGRESSIVE_TIME_SLICE` seconds, so that the UI stays responsive
+    while a large view is built. It has no effect on a virtual view.
     """
-    descriptions = _model_traits(model)
-    labels = [Label(text=desc.label) for desc in descriptions]
-    editors = [_get_editor(model, desc) for desc in descriptions]
-    objects = [widget for pair in zip(labels, editors) for widget in pair]
+    if virtual:
+        descriptions = [desc for desc, editor in _model_editors(model)]
+        return VirtualAutoView(model=model, trait_descs=descriptions)
+    pairs = _model_editors(model)
+    # the fallback editors of the model share a single TraitsUI UI, the
+    # lazy ones only build the UI of their own trait when materialized
+    if lazy:
+        shared_names = ()
+    else:
+        shared_names = tuple(
+            desc.name for desc, editor in pairs if editor is FallbackEditor)
+    if progressive:
+        view = AutoView(objects=[])
+        deferred_call(
+            _build_progressively, view, model, pairs, lazy, shared_names, 0)
+        return view
+    objects = []
+    for desc, editor in pairs:
+        objects.extend(
+            _create_pair(model, desc, editor, lazy, shared_names))
     return AutoView(objects=objects)
 
 
-def auto_window(model):
+def auto_window(model, lazy=False, virtual=False, progressive=False):
     """ Generate a window directly from a `HasTraits` instance.
+
+    With `lazy` or `progressive` set to True, the view is put in a
+    scroll area. With `lazy`, the editors are only created when they
+    are scrolled into view. With `progressive`, the window can be shown
+    immediately and the editors are appended while it is displayed.
+    With `virtual` set to True, the view is a virtualized item view,
+    see `auto_view`.
     """
-    return AutoWindow(view=auto_view(model))
+    view = auto_view(
+        model, lazy=lazy, virtual=virtual, progressive=progressive)
+    if (lazy or progressive) and not virtual:
+        view = AutoScrollView(view=view)
+    return AutoWindow(view=view)
+
+
+def auto_table(models):
+    """ Generate a table view of a list of `HasTraits` instances.
+
+    The table has one row per object and one column per trait of the
+    most derived class common to the objects. The table is a Qt item
+    view which only listens to the traits of the visible rows.
+    """
+    if len(models) > 0:
+        descriptions = _class_traits(_common_class(models))
+    else:
+        descriptions = []
+    return AutoTable(models=list(models), trait_descs=descriptions)
+
+
+def _build_progressively(view, model, pairs, lazy, shared_names, start):
+    if view.is_destroyed:
+        return
+    stop = start
+    objects = []
+    deadline = default_timer() + PROGRESSIVE_TIME_SLICE
+    while stop < len(pairs):
+        desc, editor = pairs[stop]
+        objects.extend(_create_pair(model, desc, editor, lazy, shared_names))
+        stop += 1
+        if default_timer() >= deadline:
+            break
+    _append_objects(view, objects)
+    if stop < len(pairs):
+        deferred_call(
+            _build_progressively, view, model, pairs, lazy, shared_names,
+            stop)
+
 
+def _append_objects(view, objects):
+    # Assigning the extended list would make the Include of the view
+    # insert all its objects in the view again. The new objects are
+    # inserted alone before the Include and the lists are extended in
+    # place without notification.
+    includes = [
+        child for child in view.children if isinstance(child, Include)]
+    if not includes or not includes[0].is_initialized:
+        view.objects = view.objects + objects
+        return
+    include = includes[0]
+    view.insert_children(include, objects)
+    view.objects.extend(objects)
+    if include.objects is not view.objects:
+        with include.suppress_notifications():
+            include.objects.extend(objects)
 
-def _get_editor(model, trait_desc):
+
+def _create_pair(model, trait_desc, editor, lazy, shared_names):
+    return (
+        Label(text=trait_desc.label),
+        _create_editor(model, trait_desc, editor, lazy, shared_names))
+
+
+def _get_editor(model, trait_desc, lazy=False):
+    return _create_editor(model, trait_desc, _resolve_editor(trait_desc), lazy)
+
+
+def _create_editor(model, trait_desc, editor, lazy=False, shared_names=()):
     kwargs = {'model': model, 'trait_desc': trait_desc}
     if trait_desc.tooltip:
         kwargs['tool_tip'] = trait_desc.tooltip
+    if editor is FallbackEditor:
+        kwargs['shared_names'] = shared_names
+
+    if lazy:
+        return EditorPlaceholder(factory=editor, kwargs=kwargs)
+    return editor(**kwargs)
 
+
+def _resolve_editor(trait_desc):
     if trait_desc.editor:
-        return trait_desc.editor(**kwargs)
-    else:
-        trait_type = trait_desc.trait_type
-        for key, factory in TRAIT2ENAML.items():
-            if isinstance(trait_type, key):
+        return trait_desc.editor
+    trait_type = trait_desc.trait_type
+    return _get_factory(type(trait_type))(trait_type)
+
+
+def _get_factory(trait_type_class):
+    factory = _factory_cache.get(trait_type_class)
+    if factory is None:
+        for klass in trait_type_class.__mro__:
+            registrations = _editor_registry.get(klass)
+            if registrations:
+                factory = registrations[-1][2]
                 break
         else:
-            factory = lambda trait: DefaultEditor
-        editor = factory(trait_type)
-        return editor(**kwargs)
+            factory = _default_editor_factory
+        _factory_cache[trait_type_class] = factory
+    return factory
+
+
+def _model_editors(model):
+    klass = type(model)
+    uses_class_traits = _uses_class_traits(model)
+    pairs = _class_editors_cache.get(klass) if uses_class_traits else None
+    if pairs is None:
+        pairs = [
+            (desc, _resolve_editor(desc)) for desc in _model_traits(model)]
+        if uses_class_traits:
+            _class_editors_cache[klass] = pairs
+    return pairs
+
+
+def _uses_class_traits(model):
+    # Instance traits are also created as clones of the class traits
+    # when a listener is attached, they only differ from the class
+    # traits when they are replaced with `add_trait`.
+    class_traits = type(model).__class_traits__
+    for name, trait in model._instance_traits().items():
+        class_trait = class_traits.get(name)
+        if class_trait is None:
+            continue
+        if trait.handler is not class_trait.handler:
+            return False
+    return True
+
+
+def _default_editor_factory(trait_type):
+    return FallbackEditor
 
 
 def _range_editor_factory(trait_type):
@@ -77,31 +382,77 @@ def _range_editor_factory(trait_type):
     elif isinstance(low, int) and isinstance(high, int):
         return IntRangeEditor
     else:
-        return DefaultEditor
+        return FallbackEditor
 
 
-def _time_editor_factory(trait_type):
+def _instance_editor_factory(trait_type):
     klass = trait_type.klass
     if klass is time:
         return TimeEditor
     elif klass is date:
         return DateEditor
+    elif isinstance(klass, type) and issubclass(klass, HasTraits):
+        return InstanceEditor
+    else:
+        return FallbackEditor
+
+
+def _list_editor_factory(trait_type):
+    if _is_literal_trait(trait_type.item_trait):
+        return ListEditor
+    else:
+        return FallbackEditor
+
+
+def _tuple_editor_factory(trait_type):
+    if all(_is_literal_trait(trait) for trait in trait_type.types):
+        return TupleEditor
     else:
-        return DefaultEditor
+        return FallbackEditor
+
+
+def _is_literal_trait(trait):
+    trait_type = trait.trait_type
+    if isinstance(trait_type, TraitCoerceType):
+        return issubclass(trait_type.aType, LITERAL_TYPES)
+    return isinstance(trait_type, LITERAL_TRAIT_TYPES)
 
 
 def _model_traits(model):
+    return _trait_descs(model.class_trait_names(), model.trait)
+
+
+def _class_traits(klass):
+    return _trait_descs(klass.class_trait_names(), klass.class_traits().get)
+
+
+def _is_traitsui_color(trait):
+    # The Color trait of traitsui is a compound trait holding toolkit
+    # colors, it is recognized by the color editor factory of traitsui.
+    editor = trait.editor
+    return (
+        getattr(editor, '__name__', None) == 'get_color_editor' and
+        getattr(editor, '__module__', '').startswith('traitsui.'))
+
+
+def _common_class(models):
+    for klass in type(models[0]).__mro__:
+        if all(isinstance(model, klass) for model in models):
+            return klass
+
+
+def _trait_descs(names, get_trait):
     traits = []
-    names = [
-        name for name in model.class_trait_names()
-        if not name.startswith('_')]
+    names = [name for name in names if not name.startswith('_')]
     for name in names:
-        trait = model.trait(name)
+        trait = get_trait(name)
         if type(trait.trait_type) is Event:
             continue
         label = trait.label or capwords(name.replace('_', ' '))
         tooltip = trait.tooltip
         editor = trait.enaml_editor
+        if editor is None and _is_traitsui_color(trait):
+            editor = TraitsUIColorEditor
         desc = TraitDesc(name, trait.trait_type, label, tooltip, editor)
         traits.append(desc)
     return traits
@@ -0,0 +1,114 @@
+#
+# (C) Copyright 2013 Enthought, Inc., Austin, TX
+# All right reserved.
+#
+# This file is open source software distributed according to the terms in
+# LICENSE.txt
+#
+from atom.api import Callable, Dict, set_default
+
+from enaml.application import deferred_call
+from enaml.core.api import Include
+from enaml.core.declarative import d_
+from enaml.qt.QtCore import QSize
+from enaml.widgets.raw_widget import RawWidget
+
+from traits_enaml.compat import QWidget
+
+
+class PlaceholderWidget(QWidget):
+    """ An empty widget which calls back when it is first painted.
+
+    Qt only paints the widgets which are visible, so the callback is
+    invoked when the widget is shown, scrolled into view or when its
+    group is expanded.
+
+    """
+    def __init__(self, parent, callback):
+        super(PlaceholderWidget, self).__init__(parent)
+        self._callback = callback
+
+    def sizeHint(self):
+        return QSize(80, self.fontMetrics().height() + 10)
+
+    def paintEvent(self, event):
+        super(PlaceholderWidget, self).paintEvent(event)
+        callback = self._callback
+        if callback is not None:
+            self._callback = None
+            # the widget tree cannot be modified during a paint event
+            deferred_call(callback)
+
+
+class EditorPlaceholder(RawWidget):
+    """ A lightweight widget standing for an editor until it is visible.
+
+    The editor is created and replaces the placeholder in its parent
+    when the placeholder is painted for the first time.
+
+    :Attributes:
+        **factory** = `d_(Callable())`
+            The factory of the editor, usually an enamldef.
+        **kwargs** = `d_(Dict())`
+            The keyword arguments to call the factory with.
+
+    """
+    #: The factory of the editor, usually an enamldef.
+    factory = d_(Callable())
+
+    #: The keyword arguments to call the factory with.
+    kwargs = d_(Dict())
+
+    #: Placeholders expand freely in width by default.
+    hug_width = set_default('ignore')
+
+    def create_widget(self, parent):
+        return PlaceholderWidget(parent, self.materialize)
+
+    def materialize(self):
+        """ Create the editor and replace the placeholder with it.
+
+        The editor is inserted before the placeholder in the children
+        of the parent. It also replaces the placeholder in the `objects`
+        lists which hold it, the one of its parent (e.g. an AutoView)
+        and the one of an Include of its parent, so that they keep
+        listing the displayed editor. The lists are updated in place
+        without notification, an Include would otherwise insert all its
+        objects in the parent again for each materialized editor.
+
+        Returns
+        -------
+        editor : Declarative or None
+            The created editor, None if the placeholder has already
+            been replaced or destroyed.
+
+        """
+        parent = self.parent
+        if self.is_destroyed or parent is None:
+            return None
+        editor = self.factory(**self.kwargs)
+        parent.insert_children(self, [editor])
+        for owner in self._objects_owners():
+            objects = owner.objects
+            with owner.suppress_notifications():
+                for index, obj in enumerate(objects):
+                    if obj is self:
+                        objects[index] = editor
+        self.destroy()
+        return editor
+
+    def _objects_owners(self):
+        """ Return the objects whose `objects` list holds the placeholder.
+
+        """
+        parent = self.parent
+        candidates = [parent]
+        candidates.extend(
+            child for child in parent.children if isinstance(child, Include))
+        owners = []
+        for candidate in candidates:
+            objects = getattr(candidate, 'objects', None)
+            if isinstance(objects, list) and any(
+                    obj is self for obj in objects):
+                owners.append(candidate)
+        return owners
@@ -0,0 +1,181 @@
+#
+# (C) Copyright 2013 Enthought, Inc., Austin, TX
+# All right reserved.
+#
+# This file is open source software distributed according to the terms in
+# LICENSE.txt
+#
+from ast import literal_eval
+from weakref import WeakKeyDictionary
+
+import six
+from six.moves import reprlib
+from enaml.colors import Color
+
+
+try:
+    _RecursionError = RecursionError
+except NameError:  # Python 2
+    _RecursionError = RuntimeError
+
+# The errors of literal_eval on invalid input, e.g. the TypeError of the
+# unhashable keys in '{[1]: 2}' or the errors of deeply nested input.
+_LITERAL_ERRORS = (SyntaxError, TypeError, MemoryError, _RecursionError)
+
+# Cache from Enum trait type -> EnumLookup of its values.
+_enum_lookups = WeakKeyDictionary()
+
+# The maximum number of items of the values edited as Python literals.
+# The text of the larger values is truncated and cannot be edited.
+LITERAL_MAX_ITEMS = 1000
+
+
+class _TruncatedRepr(reprlib.Repr):
+    """ A Repr truncating the subclasses of the builtin collections too,
+    e.g. the TraitListObject values of the List traits.
+    """
+
+    def repr1(self, x, level):
+        for base in (list, tuple, dict, set, frozenset):
+            if isinstance(x, base):
+                return getattr(self, 'repr_' + base.__name__)(x, level)
+        return reprlib.Repr.repr1(self, x, level)
+
+
+# The repr of the values too large to be edited as Python literals.
+_truncated_repr = _TruncatedRepr()
+_truncated_repr.maxlist = _truncated_repr.maxtuple = 20
+_truncated_repr.maxdict = _truncated_repr.maxset = 20
+_truncated_repr.maxfrozenset = 20
+_truncated_repr.maxstring = _truncated_repr.maxother = 200
+
+
+class EnumLookup(object):
+    """ The display items and the value to index mapping of Enum values.
+
+    A lookup is shared by all the editors of an Enum trait type, see
+    `enum_lookup`.
+    """
+
+    __slots__ = ('values', 'items', '_indices')
+
+    def __init__(self, values):
+        self.values = values
+        self.items = [six.text_type(value) for value in values]
+        indices = {}
+        for index, value in enumerate(values):
+            try:
+                # keep the first index of equal values, like list.index
+                indices.setdefault(value, index)
+            except TypeError:  # unhashable values are scanned
+                pass
+        self._indices = indices
+
+    def index(self, value):
+        """ Return the index of a value.
+
+        Raises ValueError if the value is not one of the values.
+        """
+        try:
+            return self._indices[value]
+        except (KeyError, TypeError):
+            return self.values.index(value)
+
+
+def enum_lookup(trait_type):
+    """ Return the EnumLookup of the values of an Enum trait type.
+
+    The lookup is cached per trait type and rebuilt if the values of
+    the trait type are replaced.
+    """
+    lookup = _enum_lookups.get(trait_type)
+    if lookup is None or lookup.values is not trait_type.values:
+        lookup = EnumLookup(trait_type.values)
+        _enum_lookups[trait_type] = lookup
+    return lookup
+
+
+def literal_editable(value):
+    """ Return whether a value is small enough to be edited as a literal.
+
+    The arrays and the collections with more than `LITERAL_MAX_ITEMS`
+    items are not.
+    """
+    if hasattr(value, 'tolist'):
+        size = value.size
+    else:
+        try:
+            size = len(value)
+        except TypeError:
+            return True
+    return size <= LITERAL_MAX_ITEMS
+
+
+def literal_text(value):
+    """ Return the Python literal text of a value.
+
+    Arrays are displayed as nested lists. The text of the values which
+    are not `literal_editable` is a truncated repr.
+    """
+    if not literal_editable(value):
+        return _truncated_repr.repr(value)
+    if hasattr(value, 'tolist'):
+        value = value.tolist()
+    return repr(value)
+
+
+def parse_literal(text):
+    """ Return the value of a Python literal text.
+
+    Raises ValueError if the text is not a valid literal.
+    """
+    try:
+        return literal_eval(text)
+    except _LITERAL_ERRORS:
+        raise ValueError('Invalid literal: {!r}'.format(text))
+
+
+def color_text(value):
+    """ Return the hexadecimal text of a pyface Color or a QColor.
+    """
+    if value is None:
+        return ''
+    elif hasattr(value, 'getRgb'):
+        return '#{:02X}{:02X}{:02X}{:02X}'.format(*value.getRgb())
+    return value.hex()
+
+
+def to_enaml_color(value):
+    """ Convert a pyface Color or a QColor to an enaml Color.
+
+    The QColor values are held by the traitsui Color traits.
+    """
+    if value is None:
+        return None
+    elif hasattr(value, 'getRgb'):
+        return Color(*value.getRgb())
+    red, green, blue, alpha = [
+        int(round(component * 255)) for component in value.rgba]
+    return Color(red, green, blue, alpha)
+
+
+def from_enaml_color(color):
+    """ Convert an enaml Color to an rgba tuple accepted by PyfaceColor.
+    """
+    return tuple(
+        component / 255.0
+        for component in (color.red, color.green, color.blue, color.alpha))
+
+
+def from_enaml_color_ints(color):
+    """ Convert an enaml Color to an rgba tuple accepted by the traitsui Color.
+    """
+    return (color.red, color.green, color.blue, color.alpha)
+
+
+def instance_text(value):
+    """ Return the text of the button editing a HasTraits instance.
+    """
+    if value is None:
+        return 'None'
+    return six.text_type(type(value).__name__)
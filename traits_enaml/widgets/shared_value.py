@@ -0,0 +1,184 @@
+#
+# (C) Copyright 2013 Enthought, Inc., Austin, TX
+# All right reserved.
+#
+# This file is open source software distributed according to the terms in
+# LICENSE.txt
+#
+import weakref
+
+from atom.api import Atom, Callable, Str, Tuple, Typed, Value
+from traits.api import HasTraits
+
+from traits_enaml.traits_tracer import traced_names
+from traits_enaml.utils import LoopbackGuard
+
+
+#: The SharedTraitValue objects, keyed on the (model id, trait name) pair.
+#: Each value is a [shared value, count] pair.
+_shared_values = {}
+
+#: The shared values used by the declarative owners, keyed on the owner id.
+#: Each value is a [lease reference, model, name] list, see `shared_value`.
+_owner_values = {}
+
+
+class SharedTraitValue(Atom):
+    """ The value of a trait shared by the widgets editing it.
+
+    A single trait listener keeps `value` in sync with the trait, the
+    widgets bind to the atom member instead of hooking up their own
+    trait listeners. Assigning `value` sets the trait. The changes of
+    the items of a collection trait are notified as changes of `value`.
+
+    """
+    #: The HasTraits instance owning the trait.
+    model = Typed(HasTraits)
+
+    #: The name of the trait.
+    name = Str()
+
+    #: The value of the trait.
+    value = Value()
+
+    #: The guard protecting `value` while it is updated from the trait.
+    guard = Typed(LoopbackGuard, ())
+
+    #: The handler hooked up to the trait.
+    handler = Callable()
+
+    #: The names of the trait and of its items trait, if any.
+    trait_names = Tuple()
+
+    def connect(self):
+        """ Hook up the trait listener and read the trait value.
+
+        """
+        def handler(name, new):
+            self.refresh(items=(name != self.name))
+
+        self.handler = handler
+        self.trait_names = traced_names(self.model, self.name)
+        self.refresh()
+        for name in self.trait_names:
+            self.model.on_trait_change(handler, name)
+
+    def disconnect(self):
+        """ Remove the trait listener.
+
+        """
+        for name in self.trait_names:
+            self.model.on_trait_change(self.handler, name, remove=True)
+
+    def refresh(self, items=False):
+        """ Update `value` from the trait.
+
+        Parameters
+        ----------
+        items : bool, optional
+            Whether the items of the collection held by the trait have
+            changed, `value` is then notified even if the trait still
+            holds the same object.
+
+        """
+        value = getattr(self.model, self.name)
+        with self.guard('value'):
+            if items and value is self.value:
+                # the items of the collection changed in place
+                self.notify('value', {
+                    'type': 'update', 'object': self, 'name': 'value',
+                    'oldvalue': value, 'value': value})
+            else:
+                self.value = value
+
+    def _observe_value(self, change):
+        """ Set the trait when `value` is assigned by a widget.
+
+        The value is restored from the trait if the assignment fails.
+
+        """
+        if change['type'] != 'update' or 'value' in self.guard:
+            return
+        try:
+            setattr(self.model, self.name, change['value'])
+        except Exception:
+            self.refresh()
+            raise
+
+
+def acquire_shared_value(model, name):
+    """ Return the SharedTraitValue of a trait, creating it if needed.
+
+    Each call must be balanced by a call to `release_shared_value`.
+    """
+    key = (id(model), name)
+    entry = _shared_values.get(key)
+    if entry is None:
+        shared = SharedTraitValue(model=model, name=name)
+        shared.connect()
+        entry = _shared_values[key] = [shared, 0]
+    entry[1] += 1
+    return entry[0]
+
+
+def release_shared_value(model, name):
+    """ Release a value returned by `acquire_shared_value`.
+
+    The trait listener is removed when the value is not used anymore.
+    """
+    key = (id(model), name)
+    entry = _shared_values[key]
+    entry[1] -= 1
+    if entry[1] == 0:
+        del _shared_values[key]
+        entry[0].disconnect()
+
+
+class _OwnerLease(object):
+    """ The 'destroyed' observer of the owner of a shared value.
+
+    The lease is only referenced by the owner, it is garbage collected
+    with an owner which is never destroyed.
+    """
+
+    def __init__(self, owner_id):
+        self.owner_id = owner_id
+
+    def __call__(self, change):
+        _release_owner_value(self.owner_id)
+
+
+def _release_owner_value(owner_id):
+    """ Release the shared value used by an owner, if any.
+    """
+    entry = _owner_values.pop(owner_id, None)
+    if entry is not None and entry[1] is not None:
+        release_shared_value(entry[1], entry[2])
+
+
+def shared_value(owner, model, name):
+    """ Return the SharedTraitValue of a trait for a declarative owner.
+
+    An owner uses one shared value at a time, the value returned by the
+    previous call for the owner is released. The expression can thus be
+    bound with a subscription which follows the changes of the model::
+
+        attr shared << shared_value(self, model, trait_desc.name)
+
+    The value is released when the owner is destroyed or garbage
+    collected. Returns None if the model is None.
+    """
+    owner_id = id(owner)
+    entry = _owner_values.get(owner_id)
+    if entry is None:
+        lease = _OwnerLease(owner_id)
+        owner.observe('destroyed', lease)
+        entry = _owner_values[owner_id] = [
+            weakref.ref(lease, lambda ref: _release_owner_value(owner_id)),
+            None, None]
+    shared = None if model is None else acquire_shared_value(model, name)
+    # acquire before releasing, an unchanged value stays connected
+    if entry[1] is not None:
+        release_shared_value(entry[1], entry[2])
+    entry[1:] = [model, name]
+    return shared
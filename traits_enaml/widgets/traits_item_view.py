@@ -0,0 +1,594 @@
+#
+# (C) Copyright 2013 Enthought, Inc., Austin, TX
+# All right reserved.
+#
+# This file is open source software distributed according to the terms in
+# LICENSE.txt
+#
+from datetime import date, time
+
+import six
+from traits.api import (
+    BaseFloat, BaseInstance, BaseInt, BaseStr, Bool, Button, Enum, HasTraits,
+    Range, TraitError)
+
+from atom.api import List, Typed, observe, set_default
+
+from enaml.core.declarative import d_
+from enaml.qt.QtCore import (
+    QAbstractTableModel, QDate, QLocale, QModelIndex, QTime, Qt, Signal)
+from enaml.qt.QtGui import QDoubleValidator
+from enaml.widgets.raw_widget import RawWidget
+
+from traits_enaml.compat import (
+    QComboBox, QLineEdit, QSpinBox, QStyledItemDelegate, QTableView)
+from traits_enaml.widgets.editor_utils import (
+    enum_lookup, literal_editable, literal_text, parse_literal)
+
+
+def cell_kind(trait_type):
+    """ Return how the values of a trait type are displayed and edited.
+
+    Parameters
+    ----------
+    trait_type : TraitType
+        The trait type of the cell.
+
+    Returns
+    -------
+    kind : str
+        One of 'button', 'bool', 'enum', 'range' (integer ranges),
+        'date', 'time', 'value' (integers and strings) for the values
+        edited with the default Qt editors, 'float' for the floats and
+        float ranges edited as text, and 'literal' for the other values
+        edited as Python literals.
+
+    """
+    if isinstance(trait_type, Button):
+        return 'button'
+    elif isinstance(trait_type, Bool):
+        return 'bool'
+    elif isinstance(trait_type, Enum):
+        return 'enum'
+    elif isinstance(trait_type, Range):
+        low, high = trait_type._low, trait_type._high
+        if isinstance(low, float) or isinstance(high, float):
+            return 'float'
+        return 'range'
+    elif isinstance(trait_type, BaseFloat):
+        return 'float'
+    elif isinstance(trait_type, (BaseInt, BaseStr)):
+        return 'value'
+    elif isinstance(trait_type, BaseInstance):
+        if trait_type.klass is date:
+            return 'date'
+        elif trait_type.klass is time:
+            return 'time'
+    return 'literal'
+
+
+class TraitsItemModel(QAbstractTableModel):
+    """ A base Qt item model whose cells display traits of objects.
+
+    Subclasses implement the table shape and reimplement the `cell`
+    method which maps a model index to the (object, TraitDesc) pair of
+    the cell.
+
+    The trait handlers of the subclasses report the changed cells with
+    `cell_changed`, which emits `dataChanged` on the thread of the model
+    even when the trait is set by a worker thread.
+
+    """
+
+    #: Emitted with the (row, column) of a cell whose trait changed.
+    cell_changed = Signal(int, int)
+
+    def __init__(self, parent=None):
+        super(TraitsItemModel, self).__init__(parent)
+        # a queued connection when emitted from another thread
+        self.cell_changed.connect(self._emit_data_changed)
+
+    def cell(self, index):
+        """ Return the (object, TraitDesc) pair of a cell, or None.
+
+        The default implementation has no trait cells and returns None.
+
+        """
+        return None
+
+    def cell_kind(self, index):
+        """ Return the kind of a cell, see `cell_kind`, or None.
+
+        """
+        cell = self.cell(index)
+        if cell is None:
+            return None
+        return cell_kind(cell[1].trait_type)
+
+    def data(self, index, role=Qt.DisplayRole):
+        cell = self.cell(index)
+        if cell is None:
+            return None
+        obj, desc = cell
+        kind = cell_kind(desc.trait_type)
+        if role == Qt.DisplayRole:
+            if kind == 'button':
+                return desc.trait_type.label
+            elif kind == 'bool':
+                return None
+            value = getattr(obj, desc.name)
+            if kind in ('date', 'time') and value is not None:
+                return value.isoformat()
+            elif kind == 'literal':
+                return literal_text(value)
+            return six.text_type(value)
+        elif role == Qt.EditRole:
+            value = getattr(obj, desc.name)
+            if kind == 'float':
+                # the full precision text, a spin box rounds the value
+                return repr(value)
+            elif kind == 'literal':
+                return literal_text(value)
+            elif kind == 'date' and value is not None:
+                return QDate(value.year, value.month, value.day)
+            elif kind == 'time' and value is not None:
+                return QTime(
+                    value.hour, value.minute, value.second,
+                    value.microsecond // 1000)
+            return value
+        elif role == Qt.CheckStateRole and kind == 'bool':
+            return Qt.Checked if getattr(obj, desc.name) else Qt.Unchecked
+        elif role == Qt.ToolTipRole and desc.tooltip:
+            return desc.tooltip
+        return None
+
+    def setData(self, index, value, role=Qt.EditRole):
+        cell = self.cell(index)
+        if cell is None:
+            return False
+        obj, desc = cell
+        kind = cell_kind(desc.trait_type)
+        if role == Qt.CheckStateRole and kind == 'bool':
+            value = value == Qt.Checked
+        elif role != Qt.EditRole:
+            return False
+        elif kind == 'date' and isinstance(value, QDate):
+            value = value.toPyDate()
+        elif kind == 'time' and isinstance(value, QTime):
+            value = value.toPyTime()
+        elif isinstance(value, six.string_types):
+            try:
+                if kind == 'float':
+                    value = float(value)
+                elif kind == 'literal':
+                    value = parse_literal(value)
+            except ValueError:
+                # raised for every invalid text, PyQt aborts when an
+                # exception escapes a Qt virtual method
+                return False
+        try:
+            setattr(obj, desc.name, value)
+        except TraitError:
+            return False
+        self.dataChanged.emit(index, index)
+        return True
+
+    def flags(self, index):
+        flags = super(TraitsItemModel, self).flags(index)
+        cell = self.cell(index)
+        if cell is None:
+            return flags
+        obj, desc = cell
+        kind = cell_kind(desc.trait_type)
+        if kind == 'bool':
+            flags |= Qt.ItemIsUserCheckable
+        elif kind == 'literal':
+            # the text of the large values is truncated
+            if literal_editable(getattr(obj, desc.name)):
+                flags |= Qt.ItemIsEditable
+        elif kind != 'button':
+            flags |= Qt.ItemIsEditable
+        return flags
+
+    def activate(self, index):
+        """ Fire the Button trait of a clicked cell.
+
+        """
+        cell = self.cell(index)
+        if cell is not None and cell_kind(cell[1].trait_type) == 'button':
+            obj, desc = cell
+            setattr(obj, desc.name, True)
+
+    def dispose(self):
+        """ Remove the trait listeners of the model.
+
+        """
+        pass
+
+    def _emit_data_changed(self, row, column):
+        index = self.index(row, column)
+        self.dataChanged.emit(index, index)
+
+
+class TraitsFormModel(TraitsItemModel):
+    """ A Qt item model with one row per trait of an object.
+
+    The first column holds the labels and the second one the values of
+    the traits. The displayed values are updated when the traits change.
+
+    """
+
+    def __init__(self, obj, trait_descs, parent=None):
+        super(TraitsFormModel, self).__init__(parent)
+        self._obj = obj
+        self._trait_descs = list(trait_descs)
+        self._rows = dict(
+            (desc.name, row) for row, desc in enumerate(self._trait_descs))
+        obj.on_trait_change(self._trait_changed)
+
+    def dispose(self):
+        self._obj.on_trait_change(self._trait_changed, remove=True)
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._trait_descs)
+
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return 2
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return ('Name', 'Value')[section]
+        return None
+
+    def cell(self, index):
+        if not index.isValid() or index.column() != 1:
+            return None
+        return self._obj, self._trait_descs[index.row()]
+
+    def data(self, index, role=Qt.DisplayRole):
+        if index.isValid() and index.column() == 0:
+            desc = self._trait_descs[index.row()]
+            if role == Qt.DisplayRole:
+                return desc.label
+            elif role == Qt.ToolTipRole and desc.tooltip:
+                return desc.tooltip
+            return None
+        return super(TraitsFormModel, self).data(index, role)
+
+    def _trait_changed(self, obj, name, old, new):
+        row = self._rows.get(name)
+        if row is not None:
+            self.cell_changed.emit(row, 1)
+
+
+class TraitsTableModel(TraitsItemModel):
+    """ A Qt item model with one row per object and one column per trait.
+
+    The model only listens to the traits of the rows given to
+    `set_visible_rows`, the other rows are refreshed by the view when
+    they are scrolled into view.
+
+    """
+
+    def __init__(self, objects, trait_descs, parent=None):
+        super(TraitsTableModel, self).__init__(parent)
+        self._objects = list(objects)
+        self._trait_descs = list(trait_descs)
+        self._columns = dict(
+            (desc.name, column)
+            for column, desc in enumerate(self._trait_descs))
+        # the same object may be displayed in several rows
+        self._rows = {}
+        for row, obj in enumerate(self._objects):
+            self._rows.setdefault(id(obj), []).append(row)
+        self._listened = set()
+
+    def set_visible_rows(self, first, last):
+        """ Listen to the traits of the visible rows only.
+
+        Parameters
+        ----------
+        first, last : int
+            The first and last visible rows, inclusive. An empty range
+            removes all the listeners.
+
+        """
+        objects = self._objects
+        visible = set(range(max(first, 0), min(last + 1, len(objects))))
+        # listen once to the objects of the rows, by their ids
+        listened = dict(
+            (id(objects[row]), objects[row]) for row in self._listened)
+        visible_objects = dict(
+            (id(objects[row]), objects[row]) for row in visible)
+        for key in set(listened) - set(visible_objects):
+            listened[key].on_trait_change(self._trait_changed, remove=True)
+        for key in set(visible_objects) - set(listened):
+            visible_objects[key].on_trait_change(self._trait_changed)
+        self._listened = visible
+
+    def dispose(self):
+        self.set_visible_rows(0, -1)
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._objects)
+
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._trait_descs)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal:
+            desc = self._trait_descs[section]
+            if role == Qt.DisplayRole:
+                return desc.label
+            elif role == Qt.ToolTipRole and desc.tooltip:
+                return desc.tooltip
+        elif orientation == Qt.Vertical and role == Qt.DisplayRole:
+            return six.text_type(section + 1)
+        return None
+
+    def cell(self, index):
+        if not index.isValid():
+            return None
+        return (
+            self._objects[index.row()], self._trait_descs[index.column()])
+
+    def _trait_changed(self, obj, name, old, new):
+        column = self._columns.get(name)
+        if column is not None:
+            for row in self._rows.get(id(obj), ()):
+                self.cell_changed.emit(row, column)
+
+
+class TraitsItemDelegate(QStyledItemDelegate):
+    """ A delegate creating the editors of the cells of a TraitsItemModel.
+
+    Only the cell which is being edited has an editor widget, the other
+    cells are painted by the delegate.
+
+    """
+
+    def createEditor(self, parent, option, index):
+        model = index.model()
+        kind = model.cell_kind(index)
+        trait_type = model.cell(index)[1].trait_type
+        if kind == 'enum':
+            editor = QComboBox(parent)
+            editor.addItems(enum_lookup(trait_type).items)
+            return editor
+        elif kind == 'range':
+            editor = QSpinBox(parent)
+            low, high = trait_type._low, trait_type._high
+            if isinstance(low, int):
+                editor.setMinimum(low)
+            if isinstance(high, int):
+                editor.setMaximum(high)
+            return editor
+        elif kind == 'float':
+            # a line edit keeps the full precision of the floats
+            editor = QLineEdit(parent)
+            validator = QDoubleValidator(editor)
+            validator.setLocale(QLocale.c())
+            if isinstance(trait_type, Range):
+                low, high = trait_type._low, trait_type._high
+                if isinstance(low, (int, float)):
+                    validator.setBottom(low)
+                if isinstance(high, (int, float)):
+                    validator.setTop(high)
+            editor.setValidator(validator)
+            return editor
+        elif kind == 'literal':
+            return QLineEdit(parent)
+        return super(TraitsItemDelegate, self).createEditor(
+            parent, option, index)
+
+    def setEditorData(self, editor, index):
+        model = index.model()
+        kind = model.cell_kind(index)
+        obj, desc = model.cell(index)
+        if kind == 'enum':
+            try:
+                row = enum_lookup(desc.trait_type).index(
+                    getattr(obj, desc.name))
+            except ValueError:
+                row = -1
+            editor.setCurrentIndex(row)
+        elif kind == 'range':
+            editor.setValue(getattr(obj, desc.name))
+        else:
+            super(TraitsItemDelegate, self).setEditorData(editor, index)
+
+    def setModelData(self, editor, model, index):
+        kind = model.cell_kind(index)
+        if kind == 'enum':
+            row = editor.currentIndex()
+            if row >= 0:
+                values = model.cell(index)[1].trait_type.values
+                model.setData(index, values[row], Qt.EditRole)
+        elif kind == 'range':
+            model.setData(index, editor.value(), Qt.EditRole)
+        else:
+            super(TraitsItemDelegate, self).setModelData(editor, model, index)
+
+
+class TraitsTableWidget(QTableView):
+    """ A table view which tells its TraitsTableModel the visible rows.
+
+    """
+
+    def __init__(self, parent=None):
+        super(TraitsTableWidget, self).__init__(parent)
+        self.verticalScrollBar().valueChanged.connect(
+            self.update_visible_rows)
+
+    def update_visible_rows(self):
+        model = self.model()
+        if not isinstance(model, TraitsTableModel):
+            return
+        viewport = self.viewport()
+        first = self.rowAt(0)
+        last = self.rowAt(viewport.height() - 1)
+        if first == -1 or not self.isVisible():
+            model.set_visible_rows(0, -1)
+            return
+        if last == -1:
+            last = model.rowCount() - 1
+        model.set_visible_rows(first, last)
+        # the rows which were not listened to may be out of date
+        model.dataChanged.emit(
+            model.index(first, 0),
+            model.index(last, model.columnCount() - 1))
+
+    def resizeEvent(self, event):
+        super(TraitsTableWidget, self).resizeEvent(event)
+        self.update_visible_rows()
+
+    def showEvent(self, event):
+        super(TraitsTableWidget, self).showEvent(event)
+        self.update_visible_rows()
+
+
+def _replace_item_model(view, old, new):
+    """ Display a new item model in a view and dispose of the old one.
+
+    """
+    view.setModel(new)
+    view.clicked.connect(new.activate)
+    if old is not None:
+        view.clicked.disconnect(old.activate)
+        old.dispose()
+        old.deleteLater()
+
+
+class TraitsFormView(RawWidget):
+    """ A virtualized view of the traits of an object.
+
+    The traits are displayed in the rows of a Qt table view, the
+    editors are created by a delegate only for the cell being edited.
+    The item model is rebuilt when `model` or `trait_descs` change.
+
+    :Attributes:
+        **model** = `d_(Typed(HasTraits))`
+            The HasTraits instance that we are using.
+        **trait_descs** = `d_(List())`
+            The TraitDesc of the traits to display.
+        **item_model** = `Typed(TraitsItemModel)`
+            A reference to the Qt item model.
+
+    """
+    #: The HasTraits instance that we are using.
+    model = d_(Typed(HasTraits))
+
+    #: The TraitDesc of the traits to display.
+    trait_descs = d_(List())
+
+    #: A reference to the Qt item model.
+    item_model = Typed(TraitsItemModel)
+
+    #: TraitsFormViews expand freely in width and height by default.
+    hug_width = set_default('ignore')
+    hug_height = set_default('ignore')
+
+    def create_widget(self, parent):
+        view = QTableView(parent)
+        view.setItemDelegate(TraitsItemDelegate(view))
+        view.verticalHeader().hide()
+        view.horizontalHeader().setStretchLastSection(True)
+        self._set_item_model(view)
+        return view
+
+    @observe('model', 'trait_descs')
+    def _traits_changed(self, change):
+        if change['type'] == 'update' and self.item_model is not None:
+            self._set_item_model(self.get_widget())
+
+    def _set_item_model(self, view):
+        old = self.item_model
+        self.item_model = TraitsFormModel(self.model, self.trait_descs, view)
+        _replace_item_model(view, old, self.item_model)
+
+    def destroy_widget(self):
+        if self.item_model is not None:
+            self.item_model.dispose()
+            self.item_model = None
+
+    def destroy(self):
+        """ A reimplemented destructor.
+
+        This destructor removes the trait listeners of the item model
+        before proceeding with the regular Enaml destruction.
+
+        """
+        self.destroy_widget()
+        super(TraitsFormView, self).destroy()
+
+
+class TraitsTableView(RawWidget):
+    """ A virtualized table of the traits of a list of objects.
+
+    Each object is displayed in a row of a Qt table view, and each
+    trait in a column. Only the traits of the visible rows are
+    listened to. The item model is rebuilt when `models` or
+    `trait_descs` change.
+
+    :Attributes:
+        **models** = `d_(List())`
+            The HasTraits instances displayed in the rows.
+        **trait_descs** = `d_(List())`
+            The TraitDesc of the traits displayed in the columns.
+        **item_model** = `Typed(TraitsTableModel)`
+            A reference to the Qt item model.
+
+    """
+    #: The HasTraits instances displayed in the rows.
+    models = d_(List())
+
+    #: The TraitDesc of the traits displayed in the columns.
+    trait_descs = d_(List())
+
+    #: A reference to the Qt item model.
+    item_model = Typed(TraitsTableModel)
+
+    #: TraitsTableViews expand freely in width and height by default.
+    hug_width = set_default('ignore')
+    hug_height = set_default('ignore')
+
+    def create_widget(self, parent):
+        view = TraitsTableWidget(parent)
+        view.setItemDelegate(TraitsItemDelegate(view))
+        self._set_item_model(view)
+        return view
+
+    @observe('models', 'trait_descs')
+    def _traits_changed(self, change):
+        if change['type'] == 'update' and self.item_model is not None:
+            self._set_item_model(self.get_widget())
+
+    def _set_item_model(self, view):
+        old = self.item_model
+        self.item_model = TraitsTableModel(
+            self.models, self.trait_descs, view)
+        _replace_item_model(view, old, self.item_model)
+        view.update_visible_rows()
+
+    def destroy_widget(self):
+        if self.item_model is not None:
+            self.item_model.dispose()
+            self.item_model = None
+
+    def destroy(self):
+        """ A reimplemented destructor.
+
+        This destructor removes the trait listeners of the item model
+        before proceeding with the regular Enaml destruction.
+
+        """
+        self.destroy_widget()
+        super(TraitsTableView, self).destroy()
@@ -0,0 +1,217 @@
+#
+# (C) Copyright 2013 Enthought, Inc., Austin, TX
+# All right reserved.
+#
+# This file is open source software distributed according to the terms in
+# LICENSE.txt
+#
+from atom.api import Atom, Event, Instance, Int, List, Value
+
+from enaml.core.compiler_nodes import new_scope
+from enaml.core.declarative import d_
+from enaml.core.pattern import Pattern
+
+
+class Iteration(Atom):
+    """ The data of one iteration of a TraitsLooper.
+
+    """
+    #: The index of the item in the iterable.
+    index = Int()
+
+    #: The item of the iterable.
+    item = Value()
+
+    #: The nodes created for the item.
+    nodes = List()
+
+
+class TraitsLooper(Pattern):
+    """ A pattern object that repeats its children over a List trait.
+
+    The TraitsLooper works like the enaml `Looper`, but it is updated
+    incrementally from the items events of a List trait. The iterable
+    should be bound with the Traits Enaml `<<` operator to the trait
+    itself, e.g. `iterable << model.values`, in an enaml file imported
+    with `traits_enaml.imports(items_events=True)`. Appending, inserting,
+    removing or replacing items then only creates and destroys the
+    children of the affected items, and the children of the items which
+    are moved are reused. Replacing the whole list refreshes all the
+    items.
+
+    Each iteration has a `loop` scope variable with the `index` and the
+    `item` of the iteration, the `index` is updated when the item is
+    moved. The items of the list do not need to be unique.
+
+    :Attributes:
+        **iterable** = `d_(Instance(list))`
+            The list of items to use when creating the children.
+        **iterable_items** = `d_(Event())`
+            The items events of the list, fired by the `<<` operator.
+
+    """
+    #: The list of items to use when creating the children.
+    iterable = d_(Instance(list))
+
+    #: The items events of the list. This event is fired by the Traits
+    #: Enaml operators and should not be fired by user code.
+    iterable_items = d_(Event())
+
+    #: The iterations of the looper, one for each item of the iterable.
+    #: This list should not be manipulated by user code.
+    iterations = List()
+
+    #--------------------------------------------------------------------------
+    # Lifetime API
+    #--------------------------------------------------------------------------
+    def destroy(self):
+        """ A reimplemented destructor.
+
+        The looper will release the owned items on destruction.
+
+        """
+        super(TraitsLooper, self).destroy()
+        del self.iterable
+        del self.iterations
+
+    #--------------------------------------------------------------------------
+    # Observers
+    #--------------------------------------------------------------------------
+    def _observe_iterable(self, change):
+        """ Refresh all the items when the iterable is replaced.
+
+        """
+        if change['type'] == 'update' and self.is_initialized:
+            self.refresh_items()
+
+    def _observe_iterable_items(self, change):
+        """ Update the affected items when the items of the list change.
+
+        """
+        if self.is_initialized:
+            self.update_items(change['value'])
+
+    #--------------------------------------------------------------------------
+    # Pattern API
+    #--------------------------------------------------------------------------
+    def pattern_items(self):
+        """ Get a list of items created by the pattern.
+
+        """
+        return [
+            node for iteration in self.iterations for node in iteration.nodes]
+
+    def refresh_items(self):
+        """ Refresh the items of the pattern.
+
+        This method destroys the old items and creates the new items.
+
+        """
+        for iteration in self.iterations:
+            self._destroy_iteration(iteration)
+
+        iterable = self.iterable
+        iterations = []
+        if iterable is not None and len(self.pattern_nodes) > 0:
+            iterations = [
+                self._create_iteration(index, item)
+                for index, item in enumerate(iterable)]
+        self.iterations = iterations
+        self._insert_iterations(iterations, self)
+
+    def update_items(self, event):
+        """ Update the items affected by an items event of the list.
+
+        Parameters
+        ----------
+        event : TraitListEvent
+            The event describing the change of the list.
+
+        """
+        index = event.index
+        iterations = self.iterations
+        if (not isinstance(index, int) or index < 0 or
+                index > len(iterations)):
+            # extended slices are handled with a full refresh
+            self.refresh_items()
+            return
+        if len(self.pattern_nodes) == 0:
+            return
+
+        stop = index + len(event.removed)
+        reusable = {}
+        for iteration in iterations[index:stop]:
+            reusable.setdefault(id(iteration.item), []).append(iteration)
+
+        new_iterations = []
+        for offset, item in enumerate(event.added, index):
+            candidates = reusable.get(id(item))
+            if candidates:
+                iteration = candidates.pop(0)
+                iteration.index = offset
+            else:
+                iteration = self._create_iteration(offset, item)
+            new_iterations.append(iteration)
+
+        for candidates in reusable.values():
+            for iteration in candidates:
+                self._destroy_iteration(iteration)
+
+        iterations[index:stop] = new_iterations
+        new_stop = index + len(new_iterations)
+        if new_stop != stop:
+            for offset in range(new_stop, len(iterations)):
+                iterations[offset].index = offset
+
+        if new_stop < len(iterations):
+            before = self._expand(iterations[new_stop].nodes)[0]
+        else:
+            before = self
+        self._insert_iterations(new_iterations, before)
+
+    #--------------------------------------------------------------------------
+    # Private API
+    #--------------------------------------------------------------------------
+    def _create_iteration(self, index, item):
+        """ Create the nodes of an iteration.
+
+        """
+        iteration = Iteration(index=index, item=item)
+        nodes = iteration.nodes
+        for pattern_nodes, key, f_locals in self.pattern_nodes:
+            with new_scope(key, f_locals) as f_locals:
+                f_locals['loop'] = iteration
+                for node in pattern_nodes:
+                    child = node(None)
+                    if isinstance(child, list):
+                        nodes.extend(child)
+                    else:
+                        nodes.append(child)
+        return iteration
+
+    def _destroy_iteration(self, iteration):
+        """ Destroy the nodes of an iteration.
+
+        """
+        for node in iteration.nodes:
+            if not node.is_destroyed:
+                node.destroy()
+
+    def _insert_iterations(self, iterations, before):
+        """ Insert the nodes of iterations in the parent before a child.
+
+        """
+        nodes = [node for iteration in iterations for node in iteration.nodes]
+        if len(nodes) > 0:
+            self.parent.insert_children(before, self._expand(nodes))
+
+    def _expand(self, nodes):
+        """ Expand the nodes of nested patterns in children order.
+
+        """
+        expanded = []
+        for node in nodes:
+            if isinstance(node, Pattern):
+                expanded.extend(self._expand(node.pattern_items()))
+            expanded.append(node)
+        return expanded
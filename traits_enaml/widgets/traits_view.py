@@ -5,10 +5,12 @@
 # This file is open source software distributed according to the terms in
 # LICENSE.txt
 #
+import weakref
+
 from traits.api import HasTraits
-from traitsui.api import View
+from traitsui.api import UItem, View
 
-from atom.api import Typed, set_default
+from atom.api import Str, Tuple, Typed, Value, set_default
 
 from enaml.core.declarative import d_
 from enaml.widgets.raw_widget import RawWidget
@@ -62,3 +64,143 @@ class TraitsView(RawWidget):
         """
         self.destroy_widget()
         super(TraitsView, self).destroy()
+
+
+#: The TraitsUI UI objects shared by the SharedTraitsView widgets, keyed on
+#: the (model id, trait names) pair. Each value is a [ui, count] pair.
+_shared_uis = {}
+
+#: The weak references to the live `SharedUILease` objects, keyed on the
+#: lease id. Their callbacks release the UIs of the collected leases.
+_ui_leases = {}
+
+
+def acquire_shared_ui(model, names):
+    """ Return the UI editing traits of a model, creating it if needed.
+
+    Each call must be balanced by a call to `release_shared_ui`.
+    """
+    key = (id(model), names)
+    entry = _shared_uis.get(key)
+    if entry is None:
+        view = View(*[UItem(name) for name in names])
+        entry = _shared_uis[key] = [
+            model.edit_traits(view, kind='subpanel'), 0]
+    entry[1] += 1
+    return entry[0]
+
+
+def release_shared_ui(model, names):
+    """ Release a UI returned by `acquire_shared_ui`.
+
+    The UI is disposed when it is not used anymore.
+    """
+    key = (id(model), names)
+    entry = _shared_uis[key]
+    entry[1] -= 1
+    if entry[1] == 0:
+        del _shared_uis[key]
+        entry[0].dispose()
+
+
+def _release_ui_lease(key, model, names):
+    if _ui_leases.pop(key, None) is not None:
+        release_shared_ui(model, names)
+
+
+class SharedUILease(object):
+    """ The use of a shared UI by a SharedTraitsView.
+
+    The lease is only referenced by its widget. The UI is released by
+    `release`, or when the lease is garbage collected with a widget
+    which was never destroyed.
+
+    """
+
+    def __init__(self, model, names):
+        self.ui = acquire_shared_ui(model, names)
+        key = id(self)
+        self._release = lambda *args: _release_ui_lease(key, model, names)
+        _ui_leases[key] = weakref.ref(self, self._release)
+
+    def release(self):
+        """ Release the shared UI, the lease must not be used anymore.
+
+        """
+        self._release()
+
+
+class SharedTraitsView(RawWidget):
+    """ A widget which shows the TraitsUI editor of one trait of a model.
+
+    The widgets showing traits of the same model with the same
+    `shared_names` share a single TraitsUI UI object, each of them
+    displays the control of the editor of its trait.
+
+    :Attributes:
+        **model** = `d_(Typed(HasTraits))`
+            The HasTraits instance that we are using.
+        **name** = `d_(Str())`
+            The name of the trait to edit.
+        **shared_names** = `d_(Tuple())`
+            The names of the traits edited by the shared UI. The
+            default is the name of the trait only.
+        **ui** = `Typed(HasTraits)`
+            A reference to the shared TraitsUI UI object.
+        **lease** = `Value()`
+            The SharedUILease of the widget on the shared UI.
+
+    """
+
+    #: The HasTraits instance that we are using.
+    model = d_(Typed(HasTraits))
+
+    #: The name of the trait to edit.
+    name = d_(Str())
+
+    #: The names of the traits edited by the shared UI.
+    shared_names = d_(Tuple())
+
+    #: A reference to the shared TraitsUI UI object.
+    ui = Typed(HasTraits)
+
+    #: The SharedUILease of the widget on the shared UI.
+    lease = Value()
+
+    #: SharedTraitsViews hug their contents' width weakly by default.
+    hug_width = set_default('weak')
+
+    def create_widget(self, parent):
+        self.lease = SharedUILease(self.model, self._ui_names())
+        self.ui = self.lease.ui
+        control = self.ui.get_editors(self.name)[0].control
+        control.setParent(parent)
+        return control
+
+    def destroy_widget(self):
+        ui = self.ui
+        if ui is not None:
+            self.ui = None
+            # give the control back to the UI which disposes it
+            editors = ui.get_editors(self.name)
+            if editors and editors[0].control is not None:
+                editors[0].control.setParent(ui.control)
+            lease = self.lease
+            self.lease = None
+            lease.release()
+
+    def destroy(self):
+        """ A reimplemented destructor.
+
+        This destructor releases the shared TraitsUI object before
+        proceeding with the regular Enaml destruction.
+
+        """
+        self.destroy_widget()
+        super(SharedTraitsView, self).destroy()
+
+    def _ui_names(self):
+        names = self.shared_names or (self.name,)
+        if self.name not in names:
+            names = names + (self.name,)
+        return names